@@ -1,18 +1,247 @@
-from modules.Board.board import BoardGUI
-from modules.Game.game import Game
+import argparse
 
-from tkinter import Tk
 
-# Create a game instance
-# The only dimensions that currently work at 7 x 6 | w x h
-game_instance = Game(7, 6)
+def run_gui(args):
+    """Opens the window of the game
 
-# Create a window and name it
-root = Tk()
-root.title('Connect 4')
+    tkinter is only imported here so that the other commands never pay for
+    it, and keep working on machines without a display.
 
-# Create the board on the window
-board_gui = BoardGUI(root, game_instance)
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments
+    """
 
-# Keeps the window running
-root.mainloop()
+    from tkinter import Tk
+
+    from modules.Board.board import BoardGUI
+    from modules.Game.game import Game
+
+    # Create a game instance, 7 x 6 | w x h with 4 in a row by default
+    game_instance = Game(args.width, args.height, connect=args.connect)
+
+    # Create a window and name it
+    root = Tk()
+    root.title('Connect 4')
+
+    # Create the board on the window
+    board_gui = BoardGUI(root, game_instance)
+
+    # Keeps the window running
+    root.mainloop()
+
+
+def run_move(args):
+    """Prints the column the bot would play, without opening a window
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments
+    """
+
+    from modules.Game import Game
+
+    game_instance = Game(args.width, args.height, connect=args.connect)
+    game_instance.moves_ahead = args.depth
+    game_instance.play_moves(args.moves)
+
+    print(game_instance.determine_ai_move(game_instance.curr_player,
+                                          args.time))
+
+
+def run_engine(args):
+    """Reads protocol commands from stdin until quit
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments
+    """
+
+    from modules.Game.game import Game
+    from modules.Game.protocol import EngineProtocol
+
+    EngineProtocol(Game(args.width, args.height, connect=args.connect)).run()
+
+
+def run_server(args):
+    """Hosts games between clients and the bot until interrupted
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments
+    """
+
+    import asyncio
+
+    from modules.Game.server import MatchServer
+
+    async def serve():
+        server = MatchServer(args.move_time, args.budget)
+        port = await server.start(args.host, args.port)
+        print('Listening on', args.host, 'port', port)
+        await server.server.serve_forever()
+
+    asyncio.run(serve())
+
+
+def run_analysis(args):
+    """Prints the analysis of every position read, one JSON line each
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments
+    """
+
+    from modules.Game.batch import run
+
+    run(args.path, args.depth, args.time, args.workers)
+
+
+def run_tournament(args):
+    """Plays the engines against each other and prints the results
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments
+    """
+
+    from modules.Game import tournament
+
+    engines = []
+    try:
+        for text in args.engine:
+            engines.append(tournament.parse_engine(
+                text, [engine['name'] for engine in engines]))
+        report = tournament.run_tournament(engines, args.games, args.plies,
+                                           args.workers, args.seed,
+                                           (args.width, args.height,
+                                            args.connect))
+    except ValueError as error:
+        raise SystemExit('error: ' + str(error))
+
+    print(tournament.format_report(report))
+    if args.output:
+        tournament.write_report(report, args.output)
+
+
+def variant_options(top_level):
+    """Builds the options of the size of the board and the length of a line
+
+    They are accepted before or after the command. Only the top-level parser
+    has defaults, otherwise the defaults of the command would replace the
+    values given before it.
+
+    Parameters
+    ----------
+    top_level : bool
+        Whether the options are for the top-level parser
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        A parser to use as a parent, with the --width, --height and
+        --connect options
+    """
+
+    def default(value):
+        return value if top_level else argparse.SUPPRESS
+
+    options = argparse.ArgumentParser(add_help=False)
+    options.add_argument('--width', type=int, default=default(7),
+                         help='number of columns (default: 7)')
+    options.add_argument('--height', type=int, default=default(6),
+                         help='number of rows (default: 6)')
+    options.add_argument('--connect', type=int, default=default(4),
+                         help='number of tokens in a winning line '
+                              '(default: 4)')
+
+    return options
+
+
+# The commands that only play the standard game
+STANDARD_ONLY = ('serve', 'analyze')
+
+variant_parser = variant_options(False)
+
+parser = argparse.ArgumentParser(description='Connect 4',
+                                 parents=[variant_options(True)])
+parser.set_defaults(command=run_gui)
+commands = parser.add_subparsers(title='commands')
+
+gui_parser = commands.add_parser('gui', help='open the window (default)',
+                                 parents=[variant_parser])
+gui_parser.set_defaults(command=run_gui)
+
+move_parser = commands.add_parser('move',
+                                  help='print the best column of a board',
+                                  parents=[variant_parser])
+move_parser.add_argument('moves', nargs='?', default='',
+                         help='the columns played so far, starting from 0')
+move_parser.add_argument('--depth', type=int, default=4,
+                         help='number of moves to look ahead')
+move_parser.add_argument('--time', type=float, default=None,
+                         help='search for this many seconds instead')
+move_parser.set_defaults(command=run_move)
+
+engine_parser = commands.add_parser('engine',
+                                    help='speak the text protocol on stdin',
+                                    parents=[variant_parser])
+engine_parser.set_defaults(command=run_engine)
+
+serve_parser = commands.add_parser('serve',
+                                   help='host games over TCP (JSON lines)')
+serve_parser.add_argument('--host', default='127.0.0.1')
+serve_parser.add_argument('--port', type=int, default=8765)
+serve_parser.add_argument('--move-time', type=float, default=1.0,
+                          help='seconds the bot may spend on one move')
+serve_parser.add_argument('--budget', type=float, default=30.0,
+                          help='seconds the bot may spend on one game')
+serve_parser.set_defaults(command=run_server, name='serve')
+
+analyze_parser = commands.add_parser('analyze',
+                                     help='analyze positions as JSON lines')
+analyze_parser.add_argument('path', nargs='?', default='-',
+                            help='file of move strings, one per line '
+                                 '(default: stdin)')
+analyze_parser.add_argument('--depth', type=int, default=6,
+                            help='number of moves to look ahead')
+analyze_parser.add_argument('--time', type=float, default=None,
+                            help='seconds to spend on each position')
+analyze_parser.add_argument('--workers', type=int, default=None,
+                            help='number of processes (default: one per CPU)')
+analyze_parser.set_defaults(command=run_analysis, name='analyze')
+
+tournament_parser = commands.add_parser('tournament',
+                                        help='play engines against each other',
+                                        parents=[variant_parser])
+tournament_parser.add_argument('--engine', action='append', required=True,
+                               help='settings of an engine, for example '
+                                    'depth=4,time=0.1,eval=flat,name=A '
+                                    '(give at least two)')
+tournament_parser.add_argument('--games', type=int, default=10,
+                               help='number of games of each pairing')
+tournament_parser.add_argument('--plies', type=int, default=2,
+                               help='number of random moves of each opening')
+tournament_parser.add_argument('--workers', type=int, default=None,
+                               help='number of processes '
+                                    '(default: one per CPU)')
+tournament_parser.add_argument('--seed', type=int, default=0,
+                               help='seed of the random openings')
+tournament_parser.add_argument('--output', default=None,
+                               help='JSON file to write the results to')
+tournament_parser.set_defaults(command=run_tournament)
+
+if __name__ == '__main__':
+    arguments = parser.parse_args()
+    if (getattr(arguments, 'name', None) in STANDARD_ONLY and
+            (arguments.width, arguments.height, arguments.connect) !=
+            (7, 6, 4)):
+        parser.error(arguments.name + ' only plays on a 7 x 6 board with '
+                     '4 in a row')
+    arguments.command(arguments)
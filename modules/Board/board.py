@@ -1,7 +1,13 @@
+# The bot searches in a separate thread so that the window keeps responding
+import queue
+import threading
+
 # tkinter is used for the creation of the GUI
 import tkinter as tk
 import tkinter.ttk as ttk
 
+from ..Game.game import SearchTimeout
+
 
 class BoardGUI:
     """This class manages the GUI of the Connect4 game.
@@ -18,14 +24,16 @@ class BoardGUI:
         The height of the canvas
     canvas : tk.Canvas
         The canvas that will display our board
+    slots : list of list of int
+        The canvas item id of the circle of each position, row by row
+    slot_colors : list of list of str
+        The color each circle is currently filled with
     player_status : dict of str and tk.StringVar
         A dictionary that tells us if a player is a human or bot
     selected_move : int
         The move that the player wishes to play
     can_move : bool
         Determines whether or not a user can click on the screen
-    callback_id : int
-        The function's callback id for future cancellation
     started : bool
         Tells us whether or not the game has started
     start_btn : tk.Button
@@ -34,6 +42,11 @@ class BoardGUI:
         Reference to the button that goes back one turn
     difficulty : tk.StringVar
         Determines the difficulty the bot should play at
+    search_game : Game or None
+        The copy of the game the bot is searching in a thread, None if the
+        bot is not searching
+    search_results : queue.Queue or None
+        The queue the thread puts the bot's column in
     """
 
     def __init__(self, root, game_inst):
@@ -52,20 +65,26 @@ class BoardGUI:
         self.game_inst = game_inst
 
         # Define the canvas width and height and create the canvas using them
+        # Each slot is 100 pixels wide with a padding of 10 around the board
         # Bind our mouse event handling function to the canvas
-        self.width = 720
-        self.height = 620
+        self.width = 20 + 100 * game_inst.width
+        self.height = 20 + 100 * game_inst.height
         self.canvas = tk.Canvas(root, width=self.width, height=self.height)
         self.canvas.bind("<Button-1>", self.column_clicked)
         self.canvas.pack(side=tk.LEFT)
         self.draw_board()
 
+        # The search thread tells the main thread it found a column with
+        # this virtual event
+        self.root.bind('<<BotMoved>>', self.bot_moved)
+
         # Set default values
         self.player_status = {'1': tk.StringVar(), '2': tk.StringVar()}
         self.selected_move = -1
         self.can_move = False
-        self.callback_id = -1
         self.started = False
+        self.search_game = None
+        self.search_results = None
 
         # Create a frame and place it on the root (the window)
         # and give it some padding using the borderwidth and pady options
@@ -110,6 +129,7 @@ class BoardGUI:
                                       values=('Human', 'Computer'),
                                       state='readonly')
         player_1_combo.set('Human')
+        player_1_combo.bind('<<ComboboxSelected>>', self.player_changed)
         player_1_combo.pack()
 
         # Add an empty label to create a gap
@@ -125,6 +145,7 @@ class BoardGUI:
                                       values=('Human', 'Computer'),
                                       state='readonly')
         player_2_combo.set('Human')
+        player_2_combo.bind('<<ComboboxSelected>>', self.player_changed)
         player_2_combo.pack()
 
         # Add an empty label to create a gap
@@ -144,7 +165,16 @@ class BoardGUI:
         difficulty_combo.pack()
 
     def draw_board(self):
-        """Draws the board onto the canvas"""
+        """Draws the board onto the canvas
+
+        The items are only created once, moves change the color of the
+        circles so that the number of items on the canvas never grows.
+        """
+
+        self.slots = [[-1] * self.game_inst.width
+                      for row in range(self.game_inst.height)]
+        self.slot_colors = [['white'] * self.game_inst.width
+                            for row in range(self.game_inst.height)]
 
         # Draw each column one at a time
         for i in range(self.game_inst.width):
@@ -158,8 +188,33 @@ class BoardGUI:
                 # Then overlap a filled white circle to make a single slot
                 self.canvas.create_rectangle(x, y, x + 100, y + 100,
                                              fill='blue')
-                self.canvas.create_oval(x, y, x + 100, y + 100,
-                                        fill='white')
+                self.slots[j][i] = self.canvas.create_oval(x, y, x + 100,
+                                                           y + 100,
+                                                           fill='white')
+
+    def clear_board(self):
+        """Empties every slot of the board that has a token"""
+
+        for row in range(self.game_inst.height):
+            for col in range(self.game_inst.width):
+                self.set_slot_color(row, col, 'white')
+
+    def set_slot_color(self, row, col, color):
+        """Changes the color of a slot if it is not already that color
+
+        Parameters
+        ----------
+        row : int
+            The row of the slot
+        col : int
+            The col of the slot
+        color : str
+            The color to fill the slot with
+        """
+
+        if self.slot_colors[row][col] != color:
+            self.slot_colors[row][col] = color
+            self.canvas.itemconfig(self.slots[row][col], fill=color)
 
     def start(self):
         """Starts the game and disables the start button"""
@@ -170,14 +225,12 @@ class BoardGUI:
         # Enable the back button once we've started
         self.back_btn.config(state=tk.NORMAL)
 
-        # Call update_board once to start the continuous calls
-        self.update_board()
-
         # Update the win_lbl to show the game has started
         self.win_lbl.config(text='The game has started.')
 
-        # Start the game
+        # Start the game and let the first player move
         self.started = True
+        self.update_board()
 
     def reset_board(self):
         """Resets the game both visually and internally"""
@@ -191,18 +244,19 @@ class BoardGUI:
         # Update the win_lbl to show the game has stopped
         self.win_lbl.config(text='The game has stopped.')
 
+        # Stop the bot from searching the old board
+        self.cancel_search()
+
         # Call on the two functions that allow us to do this
-        self.draw_board()
+        self.clear_board()
         self.game_inst.reset_board()
 
-        # Stop calling update board until we press start again
-        if self.callback_id != -1:
-            self.root.after_cancel(self.callback_id)
-            self.callback_id = -1
-
     def back_btn_clicked(self):
         """Removes the previous move"""
 
+        # The bot's search is for a board that will no longer exist
+        self.cancel_search()
+
         # Call on remove function to remove from internal state
         position = self.game_inst.remove_previous_move()
 
@@ -212,6 +266,10 @@ class BoardGUI:
             # Remove from the GUI
             self.add_token(position[0], position[1], '0')
 
+            # The player that has to move again may be a bot
+            if self.started:
+                self.update_board()
+
     def add_token(self, row, col, player):
         """Draws a token in a specific position in the player's color
 
@@ -226,10 +284,6 @@ class BoardGUI:
             '0' to draw a white circle (removes the token)
         """
 
-        # Compute the x and y values using row and col
-        x = 10 + col * 100
-        y = 10 + row * 100
-
         # Determine the color we should draw the token in
         color = 'yellow'
         if player == '0':
@@ -237,15 +291,14 @@ class BoardGUI:
         elif player == '1':
             color = 'red'
 
-        # Draw the token in the specified location with the specified color
-        self.canvas.create_oval(x, y, x + 100, y + 100,
-                                fill=color)
+        # Recolor the slot in the specified location
+        self.set_slot_color(row, col, color)
 
         # Reset to denote we've drawn a token (or that we made a move)
         self.selected_move = -1
 
     def column_clicked(self, event):
-        """Mouse click handler that sets selected_move to the right column
+        """Mouse click handler that plays the human's move in the column
 
         Parameters
         ----------
@@ -266,47 +319,145 @@ class BoardGUI:
         # If user can move and the game is not over we handle the click
         if self.can_move and not self.game_inst.is_game_over():
             # Make sure the click is in the board of the canvas
-            if event.x < 10 or event.x >= 710:
+            if event.x < 10 or event.x >= self.width - 10:
                 self.selected_move = -1
             # Set the move to the selected column based on the x of the click
             else:
-                self.selected_move = int(event.x / 100)
+                self.selected_move = int((event.x - 10) / 100)
+
+            # Play the move right away and let the next player move
+            if self.game_inst.allows_move(self.selected_move):
+                temp_player = self.game_inst.curr_player
+                row = self.game_inst.add_token(self.selected_move,
+                                               temp_player)
+                self.add_token(row, self.selected_move, temp_player)
+                self.update_board()
+
+    def player_changed(self, event):
+        """Handler for the player comboboxes
+
+        Parameters
+        ----------
+        event : tk.Event
+            The event object of the selection
+        """
+
+        # The player to move may have just become a bot
+        if self.started:
+            self.update_board()
 
     def update_board(self):
-        """Updates the board every 250 ms (0.25 s) using user's/bot's move"""
+        """Lets the next player move after a move, undo or start
+
+        Nothing is scheduled while waiting for a human, their click calls
+        this function again. For a bot, a search is started and bot_moved
+        calls this function again once it has played.
+        """
 
         # Stop the game if the game is over
         if self.game_inst.is_game_over():
             self.update_labels()
             return
 
-        # Update difficulty if necessary
-        difficulty_str = self.difficulty.get()
-        if difficulty_str == 'Easy':
-            self.game_inst.moves_ahead = 3
-        elif difficulty_str == 'Hard':
-            self.game_inst.moves_ahead = 4
-
-        # If the current player is a human
+        # If the current player is a human, wait for their click
+        # A search started while the player was a bot is no longer needed
         if self.player_status[self.game_inst.curr_player].get() == 'Human':
-            if self.game_inst.allows_move(self.selected_move):
-                temp_player = self.game_inst.curr_player
-                row = self.game_inst.add_token(self.selected_move,
-                                               self.game_inst.curr_player)
-                self.add_token(row, self.selected_move, temp_player)
-        # Otherwise the current player is a bot
-        else:
-            # Save the player and column to play in temporary variables
-            temp_player = self.game_inst.curr_player
-            col_to_play = self.game_inst.determine_ai_move(temp_player)
+            self.cancel_search()
+            return
+
+        # Otherwise the current player is a bot, start searching unless it
+        # already is
+        if self.search_game is None:
+            # Update difficulty if necessary
+            difficulty_str = self.difficulty.get()
+            if difficulty_str == 'Easy':
+                self.game_inst.moves_ahead = 3
+            elif difficulty_str == 'Hard':
+                self.game_inst.moves_ahead = 4
+
+            self.start_search()
+
+    def bot_moved(self, event):
+        """Handler for the event the search thread sends once it is done
+
+        Parameters
+        ----------
+        event : tk.Event
+            The <<BotMoved>> virtual event
+        """
+
+        # The search may have been cancelled after it sent the event
+        if self.search_results is None:
+            return
+
+        try:
+            col_to_play = self.search_results.get_nowait()
+        except queue.Empty:
+            return
 
-            # Add the token to both the GUI and the internal state of the game
-            row = self.game_inst.add_token(col_to_play,
-                                           self.game_inst.curr_player)
-            self.add_token(row, col_to_play, temp_player)
+        self.search_game = None
+        self.search_results = None
 
-        # Call the after function to have the thread call this again in 0.25 ms
-        self.callback_id = self.root.after(250, self.update_board)
+        # Add the token to both the GUI and the internal state
+        temp_player = self.game_inst.curr_player
+        row = self.game_inst.add_token(col_to_play, temp_player)
+        self.add_token(row, col_to_play, temp_player)
+
+        self.update_board()
+
+    def start_search(self):
+        """Starts searching for the bot's column in a separate thread
+
+        The thread searches a copy of the game so that the board can still
+        be drawn, and changed with the back and reset buttons, meanwhile.
+        """
+
+        self.search_game = self.game_inst.copy()
+        self.search_results = queue.Queue()
+
+        thread = threading.Thread(target=self.search,
+                                  args=(self.search_game,
+                                        self.search_results),
+                                  daemon=True)
+        thread.start()
+
+    def search(self, game, results):
+        """Searches for the bot's column, runs in the search thread
+
+        The widgets are only changed by the main thread. The column is put
+        in results, and this thread only calls event_generate to queue the
+        <<BotMoved>> event, which tells the main thread to pick it up in
+        bot_moved.
+
+        Parameters
+        ----------
+        game : Game
+            The copy of the game to search
+        results : queue.Queue
+            The queue to put the column in
+        """
+
+        try:
+            results.put(game.determine_ai_move(game.curr_player))
+        except SearchTimeout:
+            # The search was cancelled, nobody is waiting for its result
+            return
+
+        # With when='tail' the event is only queued for the main thread's
+        # loop. It fails with TclError if the window was destroyed in the
+        # meantime, and with RuntimeError if the loop has already ended
+        try:
+            self.root.event_generate('<<BotMoved>>', when='tail')
+        except (tk.TclError, RuntimeError):
+            pass
+
+    def cancel_search(self):
+        """Stops the bot's search and forgets about its result"""
+
+        if self.search_game is not None:
+            self.search_game.stop()
+            self.search_game = None
+            self.search_results = None
 
     def update_labels(self):
         """Updates the win label after someone wins or if it's a draw"""
@@ -320,9 +471,5 @@ class BoardGUI:
 
         self.win_lbl.config(text=text_to_display)
 
-        # Stop the callback
-        if self.callback_id == -1:
-            self.root.after_cancel(self.callback_id)
-
         # Disable the back button
         self.back_btn.config(state=tk.DISABLED)
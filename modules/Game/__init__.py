@@ -0,0 +1,8 @@
+"""The Connect4 engine, which never imports tkinter.
+
+Headless programs can use the engine with
+    from modules.Game import Game
+while the GUI in modules.Board is only loaded when it is needed.
+"""
+
+from .game import Game, SearchTimeout  # noqa: F401
@@ -0,0 +1,180 @@
+import json
+import multiprocessing
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .game import Game
+
+# The game of each worker process, kept between positions so that its
+# transposition table is reused by positions from the same games
+_worker_game = None
+
+
+def analyze(moves, depth, time_limit=None):
+    """Analyzes one position in a worker process
+
+    Parameters
+    ----------
+    moves : str
+        The columns played to reach the position, as taken by
+        Game.play_moves
+    depth : int
+        The deepest search to run
+    time_limit : float or None
+        The number of seconds the position may take, None for no limit
+
+    Returns
+    -------
+    dict
+        The result of Game.analyze for the position, with its "moves". A
+        position that cannot be played has an "error" instead, a finished
+        game has its "winner"
+    """
+
+    global _worker_game
+
+    if _worker_game is None:
+        _worker_game = Game()
+
+    game = _worker_game
+    game.reset_board()
+
+    result = {'moves': moves}
+    try:
+        game.play_moves(moves)
+    except ValueError as error:
+        result['error'] = str(error)
+        return result
+
+    if game.is_game_over():
+        result['winner'] = game.winner
+        return result
+
+    result.update(game.analyze(game.curr_player, depth, time_limit))
+    return result
+
+
+def write_result(output, result):
+    """Writes the result of a position as one JSON line
+
+    The line is flushed right away, so that a program reading the output
+    through a pipe gets each result as soon as it is ready.
+
+    Parameters
+    ----------
+    output : file
+        Where the results are written
+    result : dict
+        The result returned by analyze
+    """
+
+    output.write(json.dumps(result) + '\n')
+    output.flush()
+
+
+def analyze_stream(lines, output, depth=6, time_limit=None, workers=None,
+                   pending=None):
+    """Analyzes positions as they are read and writes their results
+
+    Results are written as JSON lines in the order of the positions, each
+    one as soon as it and the positions before it are analyzed. At most
+    pending positions are waiting for a worker or being analyzed at
+    any time, so the memory used stays the same no matter how many lines
+    are read.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        The positions, one move string per line, blank lines are skipped
+    output : file
+        Where the results are written
+    depth : int
+        The deepest search to run for each position
+    time_limit : float or None
+        The number of seconds each position may take, None for no limit
+    workers : int or None
+        The number of worker processes, None for one per CPU
+    pending : int or None
+        The number of positions in flight, None for four per worker
+
+    Returns
+    -------
+    int
+        The number of positions analyzed
+    """
+
+    workers = workers or multiprocessing.cpu_count()
+    if pending is None:
+        pending = 4 * workers
+
+    futures = deque()
+    count = 0
+    failures = []
+    changed = threading.Condition()
+
+    def write_finished(future):
+        # Runs once a position is analyzed, possibly while the next line is
+        # being read. The results are written as soon as every position
+        # before them is done too
+        nonlocal count
+        with changed:
+            while futures and futures[0].done():
+                try:
+                    write_result(output, futures.popleft().result())
+                    count += 1
+                except Exception as error:
+                    failures.append(error)
+            changed.notify_all()
+
+    with ProcessPoolExecutor(workers) as executor:
+        for line in lines:
+            moves = line.strip()
+            if not moves:
+                continue
+
+            # Wait for the oldest positions before reading any further
+            with changed:
+                changed.wait_for(lambda: len(futures) < pending or failures)
+                if failures:
+                    raise failures[0]
+                future = executor.submit(analyze, moves, depth, time_limit)
+                futures.append(future)
+            future.add_done_callback(write_finished)
+
+        with changed:
+            changed.wait_for(lambda: not futures or failures)
+            if failures:
+                raise failures[0]
+
+    return count
+
+
+def run(path=None, depth=6, time_limit=None, workers=None):
+    """Analyzes the positions of a file, or of stdin, to stdout
+
+    Parameters
+    ----------
+    path : str or None
+        The file to read the positions from, None or '-' for stdin
+    depth : int
+        The deepest search to run for each position
+    time_limit : float or None
+        The number of seconds each position may take, None for no limit
+    workers : int or None
+        The number of worker processes, None for one per CPU
+
+    Returns
+    -------
+    int
+        The number of positions analyzed
+    """
+
+    if path is None or path == '-':
+        return analyze_stream(sys.stdin, sys.stdout, depth, time_limit,
+                              workers)
+
+    with open(path) as positions:
+        return analyze_stream(positions, sys.stdout, depth, time_limit,
+                              workers)
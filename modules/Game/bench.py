@@ -0,0 +1,280 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+
+from .game import Game, SEARCH_DRIVERS, PLAYER_INDEX
+
+# The directory the position sets are checked in to
+POSITIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'benchmarks')
+
+# Each position set is generated from random games
+#   name: (fewest tokens, most tokens, how the result is found)
+# A positive depth is a search of that many moves, 0 means the exact
+# solver. Only end game positions can be solved in a reasonable time.
+POSITION_SETS = {
+    'beginning': (2, 8, 7),
+    'middle': (12, 20, 7),
+    'end': (20, 26, 0),
+}
+
+
+def random_position(rng, tokens, width=7, height=6):
+    """Plays random moves until the board has a number of tokens
+
+    The moves never win, and the final board has no winning move for
+    either player, so that the result is not found right away.
+
+    Parameters
+    ----------
+    rng : random.Random
+        The random number generator to pick the moves with
+    tokens : int
+        The number of tokens of the board
+    width : int
+        Number of columns of the board
+    height : int
+        Number of rows of the board
+
+    Returns
+    -------
+    str
+        The columns of the moves, one digit per move
+    """
+
+    game = Game(width, height, table_mb=0)
+
+    while True:
+        game.reset_board()
+        for move in range(tokens):
+            index = PLAYER_INDEX[game.curr_player]
+            columns = [col for col in range(width) if game.allows_move(col)
+                       and not game.position.is_winning_move(col, index)]
+            if not columns:
+                break
+            game.add_token(rng.choice(columns), game.curr_player)
+
+        # Start over if a player could win with the next token
+        if game.position.moves == tokens and not any(
+                game.allows_move(col) and
+                game.position.is_winning_move(col, index)
+                for col in range(width) for index in range(2)):
+            return ''.join(str(col) for col in game.moves_made)
+
+
+def find_result(game, depth):
+    """Finds the result of the board the way a position set does
+
+    Parameters
+    ----------
+    game : Game
+        The game to search, with the board of the position
+    depth : int
+        The number of moves to search, 0 to solve the board exactly
+
+    Returns
+    -------
+    tuple of int and int
+        A tuple containing (score, column)
+    """
+
+    player = game.curr_player
+    if depth == 0:
+        score, col, proven = game.solve(player)
+        return score, col
+
+    return game.search(player, depth)
+
+
+def generate_positions(name, count=20, seed=0):
+    """Writes a position set with the results found by the default engine
+
+    Each line of the file is the moves of a position followed by its score.
+
+    Parameters
+    ----------
+    name : str
+        The name of the set, a key of POSITION_SETS
+    count : int
+        The number of positions to write
+    seed : int
+        The seed of the random games
+
+    Returns
+    -------
+    str
+        The path of the file that was written
+    """
+
+    fewest, most, depth = POSITION_SETS[name]
+    rng = random.Random(seed)
+    game = Game()
+
+    lines = []
+    for position in range(count):
+        moves = random_position(rng, rng.randint(fewest, most))
+        game.reset_board()
+        game.play_moves(moves)
+        game.start_search()
+        score, col = find_result(game, depth)
+        lines.append(moves + ' ' + str(score) + '\n')
+
+    path = os.path.join(POSITIONS_DIR, name + '.txt')
+    with open(path, 'w') as positions:
+        positions.writelines(lines)
+
+    return path
+
+
+def load_positions(name):
+    """Reads a position set
+
+    Parameters
+    ----------
+    name : str
+        The name of the set, a key of POSITION_SETS
+
+    Returns
+    -------
+    list of tuple of str and int
+        The (moves, score) of every position
+    """
+
+    with open(os.path.join(POSITIONS_DIR, name + '.txt')) as positions:
+        return [(line.split()[0], int(line.split()[1]))
+                for line in positions if line.strip()]
+
+
+def run_set(name, driver='alphabeta', table_mb=16, limit=None):
+    """Searches every position of a set with one engine configuration
+
+    The transposition tables are cleared before each position so that the
+    positions do not help each other.
+
+    Parameters
+    ----------
+    name : str
+        The name of the set, a key of POSITION_SETS
+    driver : str
+        The search driver, one of SEARCH_DRIVERS
+    table_mb : int or float
+        The memory cap of the transposition tables
+    limit : int or None
+        The number of positions to search, None for all of them
+
+    Returns
+    -------
+    dict
+        The results of the set: the number of "positions", how many had
+        the "correct" score, the "nodes" searched, the "seconds" spent, the
+        "nodes_per_second", the average "seconds_per_position" and the
+        "hit_rate" of the transposition table
+    """
+
+    depth = POSITION_SETS[name][2]
+    game = Game(table_mb=table_mb)
+    game.search_driver = driver
+
+    positions = load_positions(name)[:limit]
+    correct = 0
+    nodes = 0
+    seconds = 0.0
+    hits = 0
+    probes = 0
+
+    for moves, expected in positions:
+        game.reset_board()
+        game.play_moves(moves)
+        game.table.clear()
+        game.solver_table.clear()
+        game.start_search()
+
+        start = time.perf_counter()
+        score, col = find_result(game, depth)
+        seconds += time.perf_counter() - start
+
+        correct += score == expected
+        nodes += game.nodes
+        table = game.solver_table if depth == 0 else game.table
+        hits += table.hits
+        probes += table.hits + table.misses
+
+    return {'positions': len(positions),
+            'correct': correct,
+            'nodes': nodes,
+            'seconds': round(seconds, 4),
+            'nodes_per_second': round(nodes / seconds) if seconds else 0,
+            'seconds_per_position': round(seconds / max(1, len(positions)),
+                                          4),
+            'hit_rate': round(hits / probes, 4) if probes else 0.0}
+
+
+def run_benchmark(drivers=SEARCH_DRIVERS, table_mb=16, limit=None):
+    """Runs every position set with every search driver
+
+    Parameters
+    ----------
+    drivers : iterable of str
+        The search drivers to benchmark
+    table_mb : int or float
+        The memory cap of the transposition tables
+    limit : int or None
+        The number of positions of each set to search, None for all
+
+    Returns
+    -------
+    dict
+        The results of each "driver" and set, and what they were run on
+    """
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                cwd=POSITIONS_DIR, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {'commit': commit,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'table_mb': table_mb,
+            'drivers': {driver: {name: run_set(name, driver, table_mb, limit)
+                                 for name in POSITION_SETS}
+                        for driver in drivers}}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the search')
+    parser.add_argument('--output', default='bench.json',
+                        help='the JSON file to write the results to')
+    parser.add_argument('--driver', action='append', choices=SEARCH_DRIVERS,
+                        help='a search driver to run (default: all)')
+    parser.add_argument('--table-mb', type=float, default=16)
+    parser.add_argument('--limit', type=int, default=None,
+                        help='number of positions of each set to search')
+    parser.add_argument('--generate', action='store_true',
+                        help='write new position sets instead')
+    args = parser.parse_args()
+
+    if args.generate:
+        for name in POSITION_SETS:
+            print('Wrote', generate_positions(name))
+    else:
+        results = run_benchmark(args.driver or SEARCH_DRIVERS, args.table_mb,
+                                args.limit)
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+            output.write('\n')
+
+        for driver, sets in results['drivers'].items():
+            for name, result in sets.items():
+                print(driver, name, str(result['correct']) + '/' +
+                      str(result['positions']), 'correct,',
+                      result['nodes'], 'nodes,',
+                      result['nodes_per_second'], 'nodes/s,',
+                      result['hit_rate'], 'hit rate')
@@ -0,0 +1,210 @@
+import argparse
+import mmap
+import struct
+
+from .game import Game, OPPONENT
+from .position import ZOBRIST_SEED
+
+# Every book file starts with a header:
+#   magic (4 bytes), version, width, height, length of a winning line,
+#   Zobrist seed, number of records
+HEADER = struct.Struct('<4sHBBBII')
+MAGIC = b'C4BK'
+VERSION = 3
+
+# Followed by the records sorted by key:
+#   position key, best column, depth searched, score
+# A board and its mirror image share a record, whose column is the one of
+# the board with the smaller Zobrist hash (see Game.table_key)
+RECORD = struct.Struct('<QBBi')
+
+
+class OpeningBook:
+    """This class looks up the best column of opening positions in a file.
+
+    The file is only opened and memory-mapped the first time a position is
+    looked up, and the records are found with a binary search, so loading a
+    book costs nothing until the bot actually needs it.
+
+    Attributes
+    ----------
+    path : str
+        The path of the book file
+    width : int
+        Number of columns of the board the book was built for
+    height : int
+        Number of rows of the board the book was built for
+    connect : int
+        The length of a winning line of the game the book was built for
+    count : int
+        The number of positions in the book
+    """
+
+    def __init__(self, path):
+        """Constructor for an OpeningBook object
+
+        Parameters
+        ----------
+        path : str
+            The path of a file written by build_book
+        """
+
+        self.path = path
+        self.width = None
+        self.height = None
+        self.connect = None
+        self.count = 0
+        self._file = None
+        self._map = None
+
+    def open(self):
+        """Memory-maps the file and reads its header
+
+        Raises
+        ------
+        ValueError
+            If the file is not a book that this version can read
+        """
+
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.width, self.height, self.connect, seed, \
+            self.count = HEADER.unpack_from(self._map, 0)
+
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(self.path + ' is not an opening book')
+
+        # The keys are Zobrist hashes so they must come from the same keys
+        if seed != ZOBRIST_SEED:
+            self.close()
+            raise ValueError(self.path + ' uses different Zobrist keys')
+
+    def close(self):
+        """Unmaps and closes the file, it is reopened on the next lookup"""
+
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._map = None
+        self._file = None
+
+    def lookup(self, game, player):
+        """Finds the best column for the board of game
+
+        Parameters
+        ----------
+        game : Game
+            The game whose board should be looked up
+        player : str
+            The player that is about to move
+
+        Returns
+        -------
+        tuple of int and int or None
+            A tuple containing (score, column), None if the board is not in
+            the book or the book is for another variant of the game
+        """
+
+        if self._map is None:
+            self.open()
+
+        if (game.width, game.height, game.connect) != (self.width, self.height,
+                                                       self.connect):
+            return None
+
+        key = game.table_key(player)
+
+        # Binary search on the sorted keys
+        low = 0
+        high = self.count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * RECORD.size
+            record_key, col, depth, score = RECORD.unpack_from(self._map,
+                                                               offset)
+            if record_key < key:
+                low = middle + 1
+            elif record_key > key:
+                high = middle - 1
+            else:
+                return score, game.table_column(col)
+
+        return None
+
+
+def build_book(path, plies, depth, width=7, height=6, connect=4):
+    """Searches every position of the first moves and writes them to a book
+
+    Parameters
+    ----------
+    path : str
+        The path of the file to write
+    plies : int
+        Positions with up to this many tokens are added to the book
+    depth : int
+        The depth (or number of moves) each position is searched to
+    width : int
+        Number of columns of the board
+    height : int
+        Number of rows of the board
+    connect : int
+        The number of tokens in a line that wins the game
+
+    Returns
+    -------
+    int
+        The number of positions written
+    """
+
+    game = Game(width, height, connect=connect)
+    records = {}
+
+    def visit(player):
+        key = game.table_key(player)
+        if key in records or game.is_game_over():
+            return
+
+        game.start_search()
+        score, col = game.search(player, depth)
+        records[key] = (game.table_column(col), depth, score)
+
+        if game.position.moves == plies:
+            return
+
+        # Add the positions after every column
+        opponent = OPPONENT[player]
+        for next_col in game.order:
+            if game.allows_move(next_col):
+                game.add_token(next_col, player, True)
+                visit(opponent)
+                game.remove_token(next_col)
+
+    visit('1')
+
+    # Write the records sorted by key so that they can be binary searched
+    with open(path, 'wb') as book_file:
+        book_file.write(HEADER.pack(MAGIC, VERSION, width, height, connect,
+                                    ZOBRIST_SEED, len(records)))
+        for key in sorted(records):
+            book_file.write(RECORD.pack(key, *records[key]))
+
+    return len(records)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build an opening book')
+    parser.add_argument('path', help='the book file to write')
+    parser.add_argument('--plies', type=int, default=4,
+                        help='number of tokens of the deepest positions')
+    parser.add_argument('--depth', type=int, default=8,
+                        help='number of moves each position is searched')
+    parser.add_argument('--width', type=int, default=7)
+    parser.add_argument('--height', type=int, default=6)
+    parser.add_argument('--connect', type=int, default=4)
+    args = parser.parse_args()
+
+    count = build_book(args.path, args.plies, args.depth, args.width,
+                       args.height, args.connect)
+    print('Wrote', count, 'positions to', args.path)
@@ -1,3 +1,40 @@
+import copy
+import time
+
+from .position import Position
+from .threats import ThreatCounter
+from .transposition import (TranspositionTable, EXACT, LOWER, UPPER,
+                            BOUND_NAMES, bound_of)
+
+# Maps each player to the index of their bitboard in Position
+PLAYER_INDEX = {'1': 0, '2': 1}
+
+# Maps each player to the player that moves after them
+OPPONENT = {'1': '2', '2': '1'}
+
+# The search algorithms the bot can use
+# alphabeta - alpha_beta_pruning with a full window at every node
+# pvs - principal_variation_search, null windows after the first column
+# mtdf - mtdf, a series of null-window alpha_beta_pruning searches
+SEARCH_DRIVERS = ('alphabeta', 'pvs', 'mtdf')
+
+# The evaluations the bot can score boards with
+# positional - each token is worth the number of winning lines its position
+#              is part of (setup_values)
+# flat - every token is worth the same, only wins are scored
+# threats - positional, plus the open lines of each player counted by a
+#           ThreatCounter, with threats scored by their row parity
+EVALUATIONS = ('positional', 'flat', 'threats')
+
+# The tables computed by Game.setup_values, keyed by (width, height, connect)
+# so that games of the same variant share them
+VALUE_TABLES = {}
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search once its deadline passed or stop was called"""
+
+
 class Game:
     """This class manages the internal state of a Connect4 game.
 
@@ -7,8 +44,12 @@ class Game:
         Number of columns for our game
     height : int
         Number of rows for our game
+    connect : int
+        The number of tokens in a line that wins the game
+    position : Position
+        The bitboards that store the tokens of each player
     board : list of list of str
-        A 2D array that represents the board of our game
+        A 2D array that represents the board of our game, built from position
         ' ' - The position has not been occupied
         '1' - The position has been occupied by Player 1
         '2' - The position has been occupied by Player 2
@@ -17,21 +58,63 @@ class Game:
     order: list of int
         An array that gives the order of columns our bot should go through
     board_score: int
-        Stores the current score of the board
+        Stores the current score of the board, the sum of position_values of
+        Player 1's tokens minus the sum for Player 2's tokens (plus the
+        score of the position's ThreatCounter with the threats evaluation)
         Positive value - favorable board for Player 1
         Negative value - favorable board for Player 2
         0 - Neutral for both players
+    table : TranspositionTable
+        Stores the results of previous searches keyed by position hash
+    evaluation : str
+        The evaluation position_values was built for, one of EVALUATIONS
+    search_driver : str
+        The search algorithm to use, one of SEARCH_DRIVERS
+    solver_threshold : int
+        The bot solves the board exactly once fewer positions than this are
+        empty, 0 to never use the solver
+    solver_table : TranspositionTable
+        Stores the results of the exact solver, whose scores are not on the
+        same scale as the heuristic scores in table
+    parallel : ParallelSearch or None
+        The process pool to search the columns of fixed-depth searches in,
+        None to search in this process
+    book : OpeningBook or None
+        The opening book to look up before searching, None to always search
+    proven : bool
+        Whether the column of the last determine_ai_move was proven by the
+        exact solver instead of estimated by the heuristic
+    last_score : int
+        The score of the column of the last determine_ai_move, on the scale
+        of the solver if proven is True
+    last_depth : int
+        The depth the last determine_ai_move searched to, 0 if the column
+        came from the opening book
+    nodes : int
+        The number of positions visited by the last search
+    deadline : float or None
+        The time.monotonic() value at which a timed search must stop
+    stop_requested : bool
+        Set by stop to make searches stop, every search stops right away
+        until it is set back to False
+    killers : list of list of int
+        The two most recent columns that caused a cutoff at each ply
+    history : list of list of int
+        For each player, how often a token in each bitboard position caused
+        a cutoff, weighted by the depth left to search
     curr_player : str
         Stores the current player's turn as '1' or '2'
     winner : str
-        Stores the winner
+        Stores the winner, '-1' while the game goes on, then '1', '2' or
+        'Draw!'. It is updated by every move that is made or taken back
     moves_ahead : int
         The number of moves to look ahead
     moves_made : list of int
-        A list that stores the moves that were made in, FIFO structure
+        The columns of the moves that were made, oldest first. Moves are
+        pushed and popped at the end
     """
 
-    def __init__(self, width=7, height=6):
+    def __init__(self, width=7, height=6, *, table_mb=16, connect=4):
         """Constructor for a Game object
 
         Parameters
@@ -40,16 +123,24 @@ class Game:
             Number of columns the game should be instantiated to
         height : int
             Number of rows the game should be instantiated to
+        table_mb : int or float
+            The memory cap of the transposition table in megabytes, only
+            given by keyword
+        connect : int
+            The number of tokens in a line that wins the game, only given by
+            keyword
         """
 
-        # Saves the width and height of the board
+        # Saves the dimensions of the board and the length of a winning line
         self.width = width
         self.height = height
+        self.connect = connect
 
-        # Initialize a 2D array with all elements initialized to ' '
-        self.board = [[' '] * width for row in range(height)]
+        # Initialize an empty position that stores the tokens as bitboards
+        self.position = Position(width, height, connect)
 
         # Set up the values for each position and the order for the bot to use
+        self.evaluation = 'positional'
         self.position_values = self.setup_values()
         self.order = self.generate_order()
 
@@ -62,6 +153,29 @@ class Game:
         # Initialize an empty list for the moves made
         self.moves_made = []
 
+        # The transposition table is kept between moves so that later
+        # searches can reuse the results of earlier ones
+        self.table = TranspositionTable(table_mb)
+
+        # Statistics and limits of the search currently running
+        self.search_driver = 'alphabeta'
+        self.solver_threshold = 20
+        self.solver_table = TranspositionTable(table_mb)
+        self.parallel = None
+        self.book = None
+        self.proven = False
+        self.last_score = 0
+        self.last_depth = 0
+        self.nodes = 0
+        self.deadline = None
+        self.stop_requested = False
+
+        # Move ordering data: two killer moves per ply and a history score
+        # per player for every position of the bitboard
+        self.killers = [[-1, -1] for ply in range(width * height + 1)]
+        self.history = [[0] * (width * self.position.stride)
+                        for player in range(2)]
+
     def __repr__(self):
         """This function creates a formatted string representation of the board
 
@@ -79,37 +193,114 @@ class Game:
         for i in range(self.height):
             rep += '|'
             for j in range(self.width):
-                rep += self.board[i][j] + '|'
+                rep += self.position.cell(i, j) + '|'
             rep += '\n'
-        rep += '---------------\n'
+        rep += '-' * (2 * self.width + 1) + '\n'
 
         return rep
 
+    @property
+    def board(self):
+        """A 2D array of the board built from the bitboards of position
+
+        Changing the returned array does not change the game, use add_token
+        and remove_token instead.
+
+        Returns
+        -------
+        list of list of str
+            The content of every position, row by row starting from the top
+        """
+
+        return [[self.position.cell(row, col) for col in range(self.width)]
+                for row in range(self.height)]
+
     def setup_values(self):
         """This function creates a table of positions in the board
 
-        The table is currently hard-coded to work only with standard Connect4
-        boards (6 x 7 | h x w). This table is used as the "heruistic function"
-        for my alpha-beta pruning algorithm.
+        This table is used as the "heruistic function" for my alpha-beta
+        pruning algorithm.
+
+        Each value is the number of lines of connect tokens that are possible
+        through that position. It accounts for all 4 directions: left/right,
+        up/down, up-right/down-left, and up-left/down-right. For a standard
+        Connect4 board (6 x 7 | h x w) the table is:
+            [[3, 4, 5, 7, 5, 4, 3],
+             [4, 6, 8, 10, 8, 6, 4],
+             [5, 8, 11, 13, 11, 8, 5],
+             [5, 8, 11, 13, 11, 8, 5],
+             [4, 6, 8, 10, 8, 6, 4],
+             [3, 4, 5, 7, 5, 4, 3]]
 
-        Each value is the number of 4-in-a-rows that are possible in that
-        position. It accounts for all 4 directions: left/right, up/down,
-        up-right/down-left, and up-left/down-right.
+        The table is only computed once for each size of board and length of
+        line, and must not be changed since other games share it.
 
         Returns
         -------
         list of list of int
             A table of values for each position in the board
         """
-        table = [[3, 4, 5, 7, 5, 4, 3],
-                 [4, 6, 8, 10, 8, 6, 4],
-                 [5, 8, 11, 13, 11, 8, 5],
-                 [5, 8, 11, 13, 11, 8, 5],
-                 [4, 6, 8, 10, 8, 6, 4],
-                 [3, 4, 5, 7, 5, 4, 3]]
 
+        variant = (self.width, self.height, self.connect)
+        if variant in VALUE_TABLES:
+            return VALUE_TABLES[variant]
+
+        table = [[0] * self.width for row in range(self.height)]
+
+        # Go through every line that fits in the board, by its first position
+        # and its direction, and count it for each position it covers
+        for row_step, col_step in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            for row in range(self.height):
+                for col in range(self.width):
+                    last_row = row + row_step * (self.connect - 1)
+                    last_col = col + col_step * (self.connect - 1)
+                    if not (0 <= last_row < self.height and
+                            0 <= last_col < self.width):
+                        continue
+
+                    for i in range(self.connect):
+                        table[row + row_step * i][col + col_step * i] += 1
+
+        VALUE_TABLES[variant] = table
         return table
 
+    def set_evaluation(self, evaluation):
+        """Changes the evaluation the bot scores boards with
+
+        The score of the board is recomputed and the transposition table is
+        cleared, since the scores it holds were found with the previous
+        evaluation.
+
+        Parameters
+        ----------
+        evaluation : str
+            One of EVALUATIONS
+
+        Raises
+        ------
+        ValueError
+            If evaluation is not one of EVALUATIONS
+        """
+
+        if evaluation in ('positional', 'threats'):
+            self.position_values = self.setup_values()
+        elif evaluation == 'flat':
+            self.position_values = [[0] * self.width
+                                    for row in range(self.height)]
+        else:
+            raise ValueError('Unknown evaluation: ' + str(evaluation))
+
+        # Only the threats evaluation counts the tokens of every line
+        if evaluation == 'threats':
+            self.position.threats = ThreatCounter(self.width, self.height,
+                                                  self.connect)
+        else:
+            self.position.threats = None
+
+        self.evaluation = evaluation
+        self.load_board(self.board)
+        self.table.clear()
+
     def generate_order(self):
         """This function generates an order to evaluate the board
 
@@ -141,10 +332,9 @@ class Game:
     def reset_board(self):
         """This function resets the board by making the board empty again."""
 
-        # Iterate through all of the positions in the board
-        for row in range(self.height):
-            for col in range(self.width):
-                self.board[row][col] = ' '
+        # Remove every token from the bitboards
+        self.position.reset()
+        self.board_score = 0
 
         # Reset the current player to player 1 and winner to -1
         self.curr_player = '1'
@@ -173,22 +363,31 @@ class Game:
             The row the token was inserted in
         """
 
-        # Iterate starting from the bottom row
-        for row in range(self.height - 1, -1, -1):
-            # If we've found an empty position at this row and col[umn]
-            # mark it as the current's player cell
-            if self.board[row][col] == ' ':
-                self.board[row][col] = player
+        # Nothing to do if the column is already full
+        if not self.position.can_play(col):
+            return None
+
+        # Mark the lowest empty position of col[umn] as the player's cell
+        threats = self.position.threats
+        if threats is not None:
+            self.board_score -= threats.score
+        row = self.position.play(col, PLAYER_INDEX[player])
+
+        # Keep the score of the board up to date
+        if player == '1':
+            self.board_score += self.position_values[row][col]
+        else:
+            self.board_score -= self.position_values[row][col]
+        if threats is not None:
+            self.board_score += threats.score
 
-                # Swap players when we're not pruning and add to the stack
-                if not pruning:
-                    self.moves_made.insert(0, col)
-                    if self.curr_player == '1':
-                        self.curr_player = '2'
-                    else:
-                        self.curr_player = '1'
+        # Swap players when we're not pruning and push onto the stack
+        if not pruning:
+            self.moves_made.append(col)
+            self.curr_player = OPPONENT[self.curr_player]
+            self.update_winner()
 
-                return row
+        return row
 
     def allows_move(self, col):
         """Determines if we can make a move in the specified col[umn]
@@ -205,7 +404,7 @@ class Game:
         """
 
         # Check for valid col value and then check for an open spot
-        return col in range(self.width) and self.board[0][col] == ' '
+        return col in range(self.width) and self.position.can_play(col)
 
     def remove_token(self, col):
         """Utility method that removes the top token from col[umn]
@@ -225,13 +424,74 @@ class Game:
         if not (col in range(self.width)):
             return -1
 
-        # Iterates from top to bottom and removes the first non-empty spot
-        for row in range(self.height):
-            if self.board[row][col] != ' ':
-                self.board[row][col] = ' '
-                return row
+        # Nothing to remove if the column is empty
+        owner = self.position.top_player(col)
+        if owner < 0:
+            return -1
+
+        # Removes the top token of the column and takes its value off the score
+        threats = self.position.threats
+        if threats is not None:
+            self.board_score -= threats.score
+        row = self.position.remove(col)
+        if owner == 0:
+            self.board_score -= self.position_values[row][col]
+        else:
+            self.board_score += self.position_values[row][col]
+        if threats is not None:
+            self.board_score += threats.score
 
-        return -1
+        return row
+
+    def load_board(self, board):
+        """Replaces the tokens of the game with the tokens of board
+
+        The tokens are added one column at a time, from the bottom up, so
+        the board only needs to be a valid Connect4 board, not the result of
+        a sequence of moves. The current player and the list of moves made
+        are left unchanged.
+
+        Parameters
+        ----------
+        board : list of list of str
+            A board with the dimensions of this game, as returned by board
+        """
+
+        self.position.reset()
+        self.board_score = 0
+
+        for col in range(self.width):
+            for row in range(self.height - 1, -1, -1):
+                if board[row][col] == ' ':
+                    break
+                self.add_token(col, board[row][col], True)
+
+    def play_moves(self, moves):
+        """Plays a sequence of moves, alternating between the players
+
+        Parameters
+        ----------
+        moves : str
+            The columns to play in, starting from 0. Either one digit per
+            move ('3342') or columns separated by spaces or commas
+            ('3 3 4 2'), which also works for boards wider than 10 columns
+
+        Raises
+        ------
+        ValueError
+            If a move is not a column or its column is full, the moves before
+            it have been played
+        """
+
+        if ' ' in moves or ',' in moves:
+            columns = moves.replace(',', ' ').split()
+        else:
+            columns = list(moves)
+
+        for col in columns:
+            if not col.isdigit() or not self.allows_move(int(col)):
+                raise ValueError('Cannot play in column ' + col)
+            self.add_token(int(col), self.curr_player)
 
     def remove_previous_move(self):
         """Removes the last move made from the board
@@ -243,12 +503,11 @@ class Game:
         """
 
         # If no moves have been made, return
-        if len(self.moves_made) <= 0:
+        if not self.moves_made:
             return -1, -1
 
-        # Pop the first item from the stack
-        column = self.moves_made[0]
-        self.moves_made = self.moves_made[1:]
+        # Pop the last move from the stack
+        column = self.moves_made.pop()
 
         # Remove the token from that column and set player to previous
         row = self.remove_token(column)
@@ -257,13 +516,48 @@ class Game:
         if row < 0:
             return -1, -1
 
-        if self.curr_player == '1':
-            self.curr_player = '2'
-        else:
-            self.curr_player = '1'
+        self.curr_player = OPPONENT[self.curr_player]
+        self.update_winner()
 
         return row, column
 
+    def snapshot(self):
+        """Saves the state of the game so that it can be restored later
+
+        The snapshot is a tuple of integers, strings and tuples, so it never
+        changes and can be kept or shared between threads. Restoring it is
+        much cheaper than copying the game or replaying its moves.
+
+        Returns
+        -------
+        tuple
+            The tokens of the board, the current player, the winner, the
+            moves made, the score of the board and the evaluation
+        """
+
+        return (self.position.snapshot(), self.curr_player, self.winner,
+                tuple(self.moves_made), self.board_score, self.evaluation)
+
+    def restore(self, state):
+        """Puts the game back in the state saved by snapshot
+
+        Parameters
+        ----------
+        state : tuple
+            A tuple returned by snapshot of a game with the same dimensions
+            and length of a winning line
+        """
+
+        position, self.curr_player, self.winner, moves, self.board_score, \
+            evaluation = state
+        self.moves_made = list(moves)
+
+        self.position.restore(position)
+
+        # The score of a snapshot from another evaluation must be recomputed
+        if evaluation != self.evaluation:
+            self.load_board(self.board)
+
     def is_game_over(self):
         """Determines if the game is over
 
@@ -273,23 +567,26 @@ class Game:
             True if it is, False if otherwise
         """
 
-        # If either player has won, we return True
-        if self.has_won('1'):
-            self.winner = '1'
-            return True
+        # The board may have been loaded since the last move
+        self.update_winner()
+        return self.winner != '-1'
 
-        if self.has_won('2'):
-            self.winner = '2'
-            return True
+    def update_winner(self):
+        """Sets winner from the tokens on the board
 
-        # Iterates through all of the columns and checks to see
-        # if we can still make a move at any of the columns
-        for col in range(self.width):
-            if self.allows_move(col):
-                return False
+        Called whenever a move is made or taken back, so that winner is
+        always the result of the board.
+        """
 
-        self.winner = 'Draw!'
-        return True
+        # Both checks read the win state cached by the position
+        if self.has_won('1'):
+            self.winner = '1'
+        elif self.has_won('2'):
+            self.winner = '2'
+        elif self.position.is_full():
+            self.winner = 'Draw!'
+        else:
+            self.winner = '-1'
 
     def has_won(self, player):
         """Wrapper method that determines if player has won the game
@@ -305,17 +602,14 @@ class Game:
             True if player has indeed won, False if otherwise
         """
 
-        # Iterate through each position and check for a 4-in-a-row
-        # by calling the check_winner helper function
-        for row in range(self.height):
-            for col in range(self.width):
-                if self.check_winner(row, col, player):
-                    return True
-
-        return False
+        # The position keeps track of wins as tokens are added and removed
+        return self.position.won[PLAYER_INDEX[player]]
 
     def check_winner(self, row, col, player):
-        """Helper method that checks for 4-in-a-row at a position for player
+        """Helper method that checks for a winning line at a position
+
+        Only the lines that start at row, col and go down, down-right,
+        up-right or right are checked.
 
         Parameters
         ----------
@@ -329,7 +623,8 @@ class Game:
         Returns
         -------
         bool
-            True if player has a 4-in-a-row at row, col, False if otherwise
+            True if player has connect tokens in a row starting at row, col,
+            False if otherwise
         """
 
         # Checks to make sure row and col are in bounds
@@ -338,105 +633,672 @@ class Game:
         if not (col in range(self.width)):
             return False
 
-        # found_winner should stay True if we did find a winner
-        found_winner = True
+        # Read the board once instead of building it for every cell
+        board = self.board
 
-        # Check to see in the 'down' direction
-        if row + 3 < self.height:
-            # Set found_winnner to False if we don't see a 4-in-a-row
-            for i in range(4):
-                if self.board[row + i][col] != player:
-                    found_winner = False
-                    break
+        # Check the 'down', 'down-right', 'up-right' and 'right' directions
+        for row_step, col_step in ((1, 0), (1, 1), (-1, 1), (0, 1)):
+            last_row = row + row_step * (self.connect - 1)
+            last_col = col + col_step * (self.connect - 1)
 
-            # Return True if we already found one
-            if found_winner:
+            # Skip the lines that would leave the board
+            if not (last_row in range(self.height) and
+                    last_col in range(self.width)):
+                continue
+
+            # Return True if we see a line of player's tokens
+            if all(board[row + row_step * i][col + col_step * i] == player
+                   for i in range(self.connect)):
                 return True
 
-        # Reset variable
-        found_winner = True
+        # Return False because we couldn't find a winning line
+        return False
 
-        # Check in the 'right' direction
-        if col + 3 < self.width:
-            # Checks to see if there's a 4-in-a-row in the down-right direction
-            if row + 3 < self.height:
-                for i in range(4):
-                    if self.board[row + i][col + i] != player:
-                        found_winner = False
-                        break
+    def copy(self):
+        """Creates a copy of the game that can be searched independently
 
-                if found_winner:
-                    return True
+        The copy has its own board and move ordering data but shares the
+        transposition tables and the opening book, so that searching the
+        copy (for example in another thread) also helps later searches of
+        this game.
 
-            found_winner = True
+        Returns
+        -------
+        Game
+            A game with the same board, players and settings
+        """
 
-            # Checks to see if there's a 4-in-a-row in the up-right direction
-            if row - 3 >= 0:
-                for i in range(4):
-                    if self.board[row - i][col + i] != player:
-                        found_winner = False
-                        break
+        other = copy.copy(self)
+        other.position = self.position.copy()
+        other.moves_made = self.moves_made[:]
+        other.killers = [killers[:] for killers in self.killers]
+        other.history = [scores[:] for scores in self.history]
+        other.deadline = None
+        other.stop_requested = False
 
-                if found_winner:
-                    return True
+        return other
 
-            found_winner = True
+    def stop(self):
+        """Makes the search that is running stop as soon as possible
 
-            # Checks to see if there's a 4-in-a-row in the right direction
-            for i in range(4):
-                if self.board[row][col + i] != player:
-                    found_winner = False
-                    break
+        This can be called from another thread. A timed search returns the
+        result of the last depth it completed, a fixed-depth search raises
+        SearchTimeout.
+        """
 
-            if found_winner:
-                return True
+        self.stop_requested = True
 
-        # Return False because we couldn't find a 4-in-a-row
-        return False
+    def limit_reached(self):
+        """Determines if the search that is running must stop
+
+        Returns
+        -------
+        bool
+            True if stop was called or the deadline has passed
+        """
 
-    def determine_ai_move(self, player):
+        if self.stop_requested:
+            return True
+
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+    def determine_ai_move(self, player, time_limit=None, max_depth=None):
         """Determines the column the bot should place the token in
 
+        Without a time limit or maximum depth the bot looks moves_ahead moves
+        ahead. Otherwise it searches deeper and deeper until time runs out,
+        the maximum depth is reached or stop is called. Boards that are in
+        the opening book are not searched at all. Near the end of the game,
+        when fewer than solver_threshold positions are empty, the board is
+        solved exactly instead (with half of the time limit, if the solver
+        runs out of time the other half is used to search normally).
+
+        The score and depth of the column are saved in last_score and
+        last_depth.
+
         Parameters
         ----------
         player : str
             The player the bot is representing
+        time_limit : float or None
+            The number of seconds the search may take, None for no limit
+        max_depth : int or None
+            The deepest search to run, None for no limit
 
         Returns
         -------
         int
             The best column the player should make
+
+        Raises
+        ------
+        SearchTimeout
+            If stop is called during a search without a time limit or
+            maximum depth, the board is left unchanged
+        """
+
+        self.start_search()
+        self.proven = False
+
+        # Play the opening from the book when the board is in it
+        if self.book is not None:
+            found = self.book.lookup(self, player)
+            if found is not None and self.allows_move(found[1]):
+                self.last_score, self.last_depth = found[0], 0
+                return found[1]
+
+        # Solve the end of the game exactly
+        empty = self.width * self.height - self.position.moves
+        if empty < self.solver_threshold:
+            solver_time = None
+            if time_limit is not None:
+                solver_time = time_limit / 2
+                time_limit -= solver_time
+
+            score, col, self.proven = self.solve(player, solver_time)
+            if self.proven:
+                self.last_score, self.last_depth = score, empty
+                return col
+
+        # Search deeper and deeper when there is a limit
+        if time_limit is not None or max_depth is not None:
+            self.last_score, col, self.last_depth = \
+                self.iterative_deepening(player, time_limit, max_depth)
+            return col
+
+        self.last_depth = self.moves_ahead
+
+        # Split the columns between processes if a pool was set up
+        if self.parallel is not None:
+            self.last_score, col = self.parallel.search(self, player,
+                                                        self.moves_ahead)
+            return col
+
+        # A single search from the root finds both the score and the column
+        # Put the board back as it was if the search is stopped
+        saved = self.snapshot()
+        try:
+            self.last_score, col = self.search(player, self.moves_ahead)
+        except SearchTimeout:
+            self.restore(saved)
+            raise
+
+        # Return the best column
+        return col
+
+    def iterative_deepening(self, player, time_limit, max_depth=None):
+        """Searches one move deeper at a time until the time limit is reached
+
+        The best column of each depth is searched first at the next depth.
+        When the deadline passes the unfinished depth is thrown away and the
+        result of the last completed depth is returned.
+
+        Parameters
+        ----------
+        player : str
+            The player that is about to move
+        time_limit : float or None
+            The number of seconds the search may take, None for no limit
+        max_depth : int or None
+            The deepest search to run, None to only stop on time or when
+            the board would be full
+
+        Returns
+        -------
+        tuple of int, int and int
+            A tuple containing (score, column, depth) of the last completed
+            depth, depth is 0 if not even a depth of 1 could be completed
+        """
+
+        # The search cannot go deeper than the number of empty positions
+        empty = self.width * self.height - self.position.moves
+        if max_depth is None or max_depth > empty:
+            max_depth = empty
+
+        # Save the board so that it can be restored if the search stops
+        # while tokens are still temporarily placed
+        saved = self.snapshot()
+
+        order = list(self.order)
+        result = (0, -1, 0)
+
+        if time_limit is not None:
+            self.deadline = time.monotonic() + time_limit
+        try:
+            for depth in range(1, max_depth + 1):
+                # The previous score is the first guess of MTD(f)
+                score, col = self.search(player, depth, order, result[0])
+                result = (score, col, depth)
+
+                # A win or loss that was found will not change at any depth
+                if abs(score) >= 999998:
+                    break
+
+                # Search the best column first in the next iteration
+                order = [col] + [c for c in order if c != col]
+        except SearchTimeout:
+            self.restore(saved)
+        finally:
+            self.deadline = None
+
+        # Play the first open column if no depth was completed
+        if result[1] == -1:
+            for col in self.order:
+                if self.allows_move(col):
+                    return result[0], col, 0
+
+        return result
+
+    def analyze(self, player, depth=None, time_limit=None):
+        """Scores every column of the board with a single search per depth
+
+        The search deepens one move at a time like iterative_deepening, and
+        saves the score of every column searched at the root. The columns
+        that improve on the best score found before them get an exact score,
+        the others are cut off by the window and their score is only a bound
+        that proves they are not better.
+
+        Parameters
+        ----------
+        player : str
+            The player that is about to move
+        depth : int or None
+            The deepest search to run, None for moves_ahead (or no limit if
+            there is a time limit)
+        time_limit : float or None
+            The number of seconds the search may take, None for no limit
+
+        Returns
+        -------
+        dict
+            The result of the last completed depth:
+                "best" - the best column, -1 if no depth was completed
+                "score" - the score of the best column
+                "scores" - the score of every column, None if it is full
+                "bounds" - 'exact', 'lower' or 'upper' for every score
+                "pv" - the principal variation, the columns the players are
+                       expected to play starting with the best one
+                "depth" - the depth that was completed, 0 if none was
+                "nodes" - the number of positions visited
         """
 
-        # Initial call to our recursive alpha_beta_pruning method
-        score, col = self.alpha_beta_pruning(self.order[0], self.moves_ahead,
-                                             -999999, 999999, self.board_score,
-                                             player)
+        empty = self.width * self.height - self.position.moves
+        if depth is None and time_limit is None:
+            depth = self.moves_ahead
+        if depth is None or depth > empty:
+            depth = empty
+
+        # Every driver saves the same exact scores, MTD(f) only runs null
+        # windows so the other drivers are used instead
+        principal_variation = self.search_driver == 'pvs'
+
+        saved = self.snapshot()
+
+        self.start_search()
+        order = list(self.order)
+        result = (0, -1, 0, [None] * self.width)
+
+        if time_limit is not None:
+            self.deadline = time.monotonic() + time_limit
+        try:
+            for current in range(1, depth + 1):
+                scores = [None] * self.width
+                score, col = self.search_root(player, current, order=order,
+                                              principal_variation=(
+                                                  principal_variation),
+                                              scores=scores)
+                result = (score, col, current, scores)
+
+                # A win or loss that was found will not change at any depth
+                if abs(score) >= 999998:
+                    break
+
+                order = [col] + [c for c in order if c != col]
+        except SearchTimeout:
+            self.restore(saved)
+        finally:
+            self.deadline = None
+
+        score, col, depth, scores = result
+
+        return {'best': col,
+                'score': score,
+                'scores': [None if entry is None else entry[0]
+                           for entry in scores],
+                'bounds': [None if entry is None else BOUND_NAMES[entry[1]]
+                           for entry in scores],
+                'pv': self.principal_variation_line(player, col, depth),
+                'depth': depth,
+                'nodes': self.nodes}
+
+    def principal_variation_line(self, player, col, length):
+        """Follows the best columns saved in the transposition table
+
+        Parameters
+        ----------
+        player : str
+            The player that is about to move
+        col : int
+            The best column of the player, where the line starts
+        length : int
+            The maximum number of columns in the line
+
+        Returns
+        -------
+        list of int
+            The columns of the line, it ends early once the game is over or
+            a position is missing from the table
+        """
+
+        line = []
+        while (len(line) < length and self.allows_move(col)
+               and not any(self.position.won)):
+            self.add_token(col, player, True)
+            line.append(col)
+
+            player = OPPONENT[player]
+            entry = self.table.probe(self.table_key(player))
+            col = -1 if entry is None else self.table_column(entry[4])
+
+        # Take the tokens of the line back off the board
+        for col in reversed(line):
+            self.remove_token(col)
+
+        return line
+
+    def solve(self, player, time_limit=None):
+        """Computes the exact result of the board with perfect play
+
+        The score counts how early the game ends: a win with the last token
+        of the board is worth 1, a win one move (of each player) earlier is
+        worth 2, and so on. A draw is worth 0 and losses are negative. Since
+        the score is exact, the solver can stop searching a column as soon
+        as it is proven to be no better than one already searched.
+
+        Parameters
+        ----------
+        player : str
+            The player that is about to move
+        time_limit : float or None
+            The number of seconds the solver may take, None for no limit
+
+        Returns
+        -------
+        tuple of int, int and bool
+            A tuple containing (score, column, proven). score is positive if
+            player '1' wins and negative if player '2' wins. proven is False
+            if the solver ran out of time, score and column are then 0, -1
+        """
+
+        position = self.position
+        index = PLAYER_INDEX[player]
+        opponent = OPPONENT[player]
+
+        # Winning right away is always the best move
+        for col in self.order:
+            if position.can_play(col) and position.is_winning_move(col, index):
+                score = (self.width * self.height + 1 - position.moves) // 2
+                return (score if player == '1' else -score), col, True
+
+        saved = position.snapshot()
+        if time_limit is not None:
+            self.deadline = time.monotonic() + time_limit
+
+        # Search every column, the score of each is seen from the opponent
+        best_score = -self.width * self.height
+        best_col = -1
+        try:
+            for col in self.order:
+                if not position.can_play(col):
+                    continue
+
+                position.play(col, index)
+                score = -self.solve_node(-self.width * self.height,
+                                         -best_score, opponent)
+                position.remove(col)
+
+                if score > best_score:
+                    best_score = score
+                    best_col = col
+        except SearchTimeout:
+            position.restore(saved)
+            return 0, -1, False
+        finally:
+            self.deadline = None
+
+        # Scores were computed for the player to move
+        if player == '2':
+            best_score = -best_score
+
+        return best_score, best_col, True
+
+    def solve_node(self, alpha, beta, player):
+        """Recursive function of the exact solver
+
+        Scores are seen from the player to move (negamax), positive if they
+        win. The search fails hard: a score at or below alpha means the real
+        score is at most alpha, at or above beta means at least beta.
+
+        Parameters
+        ----------
+        alpha : int
+            The score the player to move is already guaranteed
+        beta : int
+            The score the opponent is already guaranteed, negated
+        player : str
+            The player that is about to move
+
+        Returns
+        -------
+        int
+            The score of the board for player
+        """
+
+        self.nodes += 1
+        if not self.nodes & 255 and self.limit_reached():
+            raise SearchTimeout()
+
+        position = self.position
+        index = PLAYER_INDEX[player]
+        cells = self.width * self.height
+
+        # A full board is a draw
+        if position.moves == cells:
+            return 0
+
+        # Win with the next token if possible
+        for col in self.order:
+            if position.can_play(col) and position.is_winning_move(col, index):
+                return (cells + 1 - position.moves) // 2
+
+        # Otherwise the best possible result is to win with the token after
+        # the next one, so the window can be narrowed
+        max_score = (cells - 1 - position.moves) // 2
+        if beta > max_score:
+            beta = max_score
+            if alpha >= beta:
+                return beta
+
+        # Use the bounds found by previous searches of this board
+        key = self.table_key(player)
+        entry = self.solver_table.probe(key)
+        if entry is not None:
+            if entry[3] == EXACT:
+                return entry[2]
+            elif entry[3] == LOWER:
+                alpha = max(alpha, entry[2])
+            else:
+                beta = min(beta, entry[2])
+
+            if alpha >= beta:
+                return entry[2]
+
+        opponent = OPPONENT[player]
+        alpha_start = alpha
 
-        # Go through all of the columns in the order saved in self.order
-        for i in range(1, len(self.order)):
-            res, temp_col = self.alpha_beta_pruning(self.order[i],
-                                                    self.moves_ahead,
-                                                    -999999, 999999,
-                                                    self.board_score, player)
+        for col in self.order:
+            if not position.can_play(col):
+                continue
+
+            position.play(col, index)
+            score = -self.solve_node(-beta, -alpha, opponent)
+            position.remove(col)
+
+            # The opponent will not let the game reach this board
+            if score >= beta:
+                self.solver_table.store(key, 0, score, LOWER,
+                                        self.table_column(col))
+                return score
+
+            alpha = max(alpha, score)
+
+        if alpha > alpha_start:
+            self.solver_table.store(key, 0, alpha, EXACT, -1)
+        else:
+            self.solver_table.store(key, 0, alpha, UPPER, -1)
+
+        return alpha
+
+    def search(self, player, depth, order=None, guess=None):
+        """Searches the board with the algorithm set in search_driver
+
+        Every driver returns the same score and column for a given depth,
+        they only differ in how many positions they visit to find them.
+
+        Parameters
+        ----------
+        player : str
+            The player that is about to move
+        depth : int
+            The depth (or number of moves) to look ahead, at least 1
+        order : list of int or None
+            The order to search the columns in, None to use self.order
+        guess : int or None
+            An estimate of the score used by MTD(f), None to use board_score
+
+        Returns
+        -------
+        tuple of int and int
+            A tuple containing (score, column) of the best column to play
+        """
+
+        if self.search_driver == 'alphabeta':
+            return self.search_root(player, depth, order=order)
+        elif self.search_driver == 'pvs':
+            return self.search_root(player, depth, order=order,
+                                    principal_variation=True)
+        elif self.search_driver == 'mtdf':
+            if guess is None:
+                guess = self.board_score
+            return self.mtdf(player, depth, guess, order)
+
+        raise ValueError('Unknown search driver: ' + str(self.search_driver))
+
+    def mtdf(self, player, depth, guess, order=None):
+        """Finds the score of the board with the MTD(f) algorithm
+
+        MTD(f) only runs null-window searches, which prune much more than a
+        full window. Each search tells whether the score is above or below
+        the guess and the guess is moved until both bounds meet. The
+        transposition table keeps the searches after the first one cheap:
+            https://en.wikipedia.org/wiki/MTD(f)
+
+        Parameters
+        ----------
+        player : str
+            The player that is about to move
+        depth : int
+            The depth (or number of moves) to look ahead, at least 1
+        guess : int
+            The first estimate of the score, the closer the faster
+        order : list of int or None
+            The order to search the columns in, None to use self.order
+
+        Returns
+        -------
+        tuple of int and int
+            A tuple containing (score, column) of the best column to play
+        """
+
+        lower = -999999
+        upper = 999999
+        score = guess
+        best_col = -1
+
+        while lower < upper:
+            beta = score + 1 if score == lower else score
+            score, col = self.search_root(player, depth, beta - 1, beta,
+                                          order)
+
+            # The score is at least beta, col reaches it
+            if score >= beta:
+                lower = score
+                if player == '1':
+                    best_col = col
+            # The score is below beta, col is the best of the upper bounds
+            else:
+                upper = score
+                if player == '2':
+                    best_col = col
+
+        # No search proved a column, every column has the same score
+        if best_col == -1:
+            best_col = col
+
+        return score, best_col
+
+    def search_root(self, player, depth, alpha=-999999, beta=999999,
+                    order=None, principal_variation=False, scores=None):
+        """Searches every column from the current board in a single pass
+
+        Each column is played and the reply is searched by alpha_beta_pruning
+        with the window narrowed by the columns searched before it, so that
+        the pruning done for one column carries over to the next ones.
+
+        Parameters
+        ----------
+        player : str
+            The player that is about to move
+        depth : int
+            The depth (or number of moves) to look ahead, at least 1
+        alpha : int
+            The score player '1' is already guaranteed
+        beta : int
+            The score player '2' is already guaranteed
+        order : list of int or None
+            The order to search the columns in, None to use self.order
+        principal_variation : bool
+            Whether to search the replies with principal_variation_search
+            instead of alpha_beta_pruning
+        scores : list or None
+            If given, the (score, bound) of every column searched is saved
+            at the index of the column. The bound is EXACT for the columns
+            that improved on the best score, the others were cut off by the
+            window and their score is only an UPPER (or LOWER) bound
+
+        Returns
+        -------
+        tuple of int and int
+            A tuple containing (score, column) of the best column to play,
+            column is -1 if no column can be played
+        """
+
+        opponent = OPPONENT[player]
+
+        # Start from the worst possible score for the player
+        best_score = -999999 if player == '1' else 999999
+        best_col = -1
+
+        if order is None:
+            order = self.order
+
+        # Win right away or skip the columns that lose right away, unless
+        # every column must be scored
+        moves = [col for col in order if self.allows_move(col)]
+        if scores is None:
+            winning_col, moves = self.tactical_moves(player, moves, depth)
+            if winning_col >= 0:
+                return (999998 if player == '1' else -999998), winning_col
+
+        # Go through all of the columns in the given order
+        for col in moves:
+
+            # Play the column and search the reply
+            self.add_token(col, player, True)
+            if principal_variation:
+                res = self.search_child(depth - 1, alpha, beta, opponent, 1,
+                                        best_col == -1)
+            else:
+                res = self.alpha_beta_pruning(col, depth - 1, alpha, beta,
+                                              self.board_score, opponent, 1)[0]
+            self.remove_token(col)
+
+            if scores is not None:
+                scores[col] = (res, bound_of(res, alpha, beta))
 
             # Player '1' should be maximizing their score
             # The higher the score, the better
             if player == '1':
-                if score < res:
-                    score = res
-                    col = temp_col
+                if res > best_score:
+                    best_score = res
+                    best_col = col
+                alpha = max(alpha, res)
             # Player '2' should be minimizing their score
             # The lower the score, the better
             else:
-                if score > res:
-                    score = res
-                    col = temp_col
+                if res < best_score:
+                    best_score = res
+                    best_col = col
+                beta = min(beta, res)
 
-        # Return the best column
-        return col
+            # Only happens when the caller gave a narrow window
+            if beta <= alpha:
+                break
+
+        return best_score, best_col
 
-    def alpha_beta_pruning(self, col, depth, alpha, beta, score, player):
+    def alpha_beta_pruning(self, col, depth, alpha, beta, score, player,
+                           ply=0):
         """Recursive function that computes the best column starting from col
 
         This function is the heart of the bot. It implements a search algorithm
@@ -465,6 +1327,8 @@ class Game:
             The score of the current node in the decision tree
         player : str
             The player that we're currently making the decision for
+        ply : int
+            The number of moves made since the root of the search
 
         Returns
         -------
@@ -472,17 +1336,43 @@ class Game:
             A tuple containing (score, column) in that order of the best path
         """
 
+        # Stop the search once in a while if it has run out of time
+        self.nodes += 1
+        if not self.nodes & 255 and self.limit_reached():
+            raise SearchTimeout()
+
         # If either player has won, return the value that favors them the most
         # I use +/- 999998 to simulate +/- infinity
-        if self.has_won('1'):
+        # The position caches who has won so this does not scan the board
+        won = self.position.won
+        if won[0]:
             return 999998, col
-        elif self.has_won('2'):
+        elif won[1]:
             return -999998, col
 
         # Evaluate the state of the board if we must stop
-        if depth == 0 or self.is_game_over():
+        if depth == 0 or self.position.is_full():
             return score, col
 
+        # Look for a previous search of this position that went deep enough
+        # and narrow the window with its score
+        key = self.table_key(player)
+        found, table_move, alpha, beta = self.probe_table(key, depth, alpha,
+                                                          beta)
+        if found is not None:
+            return found, table_move
+
+        # Win right away if possible, otherwise drop the moves that lose
+        # right away
+        moves = self.ordered_moves(player, ply, table_move)
+        winning_col, moves = self.tactical_moves(player, moves, depth)
+        if winning_col >= 0:
+            return (999998 if player == '1' else -999998), winning_col
+
+        # Save the window to know what kind of bound the result will be
+        alpha_start = alpha
+        beta_start = beta
+
         # Maximizing the score for player '1'
         if player == '1':
             # Variables to keep track of the best states for player '1'
@@ -490,20 +1380,19 @@ class Game:
             column_to_play = -1
 
             # Iterate through each column in the computed order
-            for col in self.order:
+            for col in moves:
                 if self.allows_move(col):
 
                     # Temporarily add a token
-                    temp_row = self.add_token(col, player, True)
+                    self.add_token(col, player, True)
 
-                    # Compute the new score after adding the token and
-                    # recursively call to go down this path
-                    # Note that we add since this is player's 1 turn
-                    curr_pos_val = score + self.position_values[temp_row][col]
+                    # add_token computed the new score after adding the
+                    # token, recursively call to go down this path
+                    curr_pos_val = self.board_score
                     current_eval = self.alpha_beta_pruning(col, depth - 1,
                                                            alpha, beta,
                                                            curr_pos_val,
-                                                           '2')[0]
+                                                           '2', ply + 1)[0]
 
                     # Update alpha to make sure it is the biggest score
                     alpha = max(alpha, current_eval)
@@ -517,10 +1406,14 @@ class Game:
                     self.remove_token(col)
 
                     # Terminate early if we already have the best path
+                    # and remember the column that caused it
                     if beta <= alpha:
+                        self.record_cutoff(player, ply, col, depth)
                         break
 
-            # Return the best score and col to play as a tuple for player '1'
+            # Save the result and return the best score and col to play
+            self.store_result(key, depth, max_evaluation, column_to_play,
+                              alpha_start, beta_start)
             return max_evaluation, column_to_play
 
         # Minimizing the score for player '2'
@@ -530,20 +1423,19 @@ class Game:
             column_to_play = -1
 
             # Iterate through each column in the computed order
-            for col in range(self.width):
+            for col in moves:
                 if self.allows_move(col):
 
                     # Temporarily add a token
-                    temp_row = self.add_token(col, player, True)
+                    self.add_token(col, player, True)
 
-                    # Compute the new score after adding the token and
-                    # recursively call to go down this path
-                    # Note that we subtract since this is player 2's turn
-                    curr_pos_val = score - self.position_values[temp_row][col]
+                    # add_token computed the new score after adding the
+                    # token, recursively call to go down this path
+                    curr_pos_val = self.board_score
                     current_eval = self.alpha_beta_pruning(col, depth - 1,
                                                            alpha, beta,
                                                            curr_pos_val,
-                                                           '1')[0]
+                                                           '1', ply + 1)[0]
 
                     # Update beta to make sure it is the smallest score
                     beta = min(beta, current_eval)
@@ -557,8 +1449,401 @@ class Game:
                     self.remove_token(col)
 
                     # Terminate early if we already have the best path
+                    # and remember the column that caused it
                     if beta <= alpha:
+                        self.record_cutoff(player, ply, col, depth)
                         break
 
-            # Return the best score and col to play as a tuple for player '2'
+            # Save the result and return the best score and col to play
+            self.store_result(key, depth, min_evalulation, column_to_play,
+                              alpha_start, beta_start)
             return min_evalulation, column_to_play
+
+    def principal_variation_search(self, depth, alpha, beta, player, ply=0):
+        """Recursive function that computes the best column with PVS
+
+        Principal variation search assumes that the first column of the
+        ordered moves is the best one. It searches that column with the full
+        window and only checks that the other columns are worse with a
+        null window, which prunes much more. A column that turns out to be
+        better is searched again with the full window:
+            https://en.wikipedia.org/wiki/Principal_variation_search
+
+        Parameters
+        ----------
+        depth : int
+            The depth (or number of moves) to keep looking ahead
+        alpha : int
+            The best score that player '1' can achieve
+        beta : int
+            The best score that player '2' can achieve
+        player : str
+            The player that we're currently making the decision for
+        ply : int
+            The number of moves made since the root of the search
+
+        Returns
+        -------
+        tuple of int and int
+            A tuple containing (score, column) in that order of the best path
+        """
+
+        # Stop the search once in a while if it has run out of time
+        self.nodes += 1
+        if not self.nodes & 255 and self.limit_reached():
+            raise SearchTimeout()
+
+        # Same terminal scores as alpha_beta_pruning
+        won = self.position.won
+        if won[0]:
+            return 999998, -1
+        elif won[1]:
+            return -999998, -1
+
+        if depth == 0 or self.position.is_full():
+            return self.board_score, -1
+
+        key = self.table_key(player)
+        found, table_move, alpha, beta = self.probe_table(key, depth, alpha,
+                                                          beta)
+        if found is not None:
+            return found, table_move
+
+        moves = self.ordered_moves(player, ply, table_move)
+        winning_col, moves = self.tactical_moves(player, moves, depth)
+        if winning_col >= 0:
+            return (999998 if player == '1' else -999998), winning_col
+
+        alpha_start = alpha
+        beta_start = beta
+
+        opponent = OPPONENT[player]
+        best_score = -999999 if player == '1' else 999999
+        column_to_play = -1
+
+        for col in moves:
+            self.add_token(col, player, True)
+            current_eval = self.search_child(depth - 1, alpha, beta, opponent,
+                                             ply + 1, column_to_play == -1)
+            self.remove_token(col)
+
+            # Player '1' maximizes and player '2' minimizes
+            if player == '1':
+                if current_eval > best_score:
+                    best_score = current_eval
+                    column_to_play = col
+                alpha = max(alpha, current_eval)
+            else:
+                if current_eval < best_score:
+                    best_score = current_eval
+                    column_to_play = col
+                beta = min(beta, current_eval)
+
+            if beta <= alpha:
+                self.record_cutoff(player, ply, col, depth)
+                break
+
+        self.store_result(key, depth, best_score, column_to_play,
+                          alpha_start, beta_start)
+        return best_score, column_to_play
+
+    def search_child(self, depth, alpha, beta, player, ply, first):
+        """Searches the board after a move for principal_variation_search
+
+        Parameters
+        ----------
+        depth : int
+            The depth (or number of moves) to keep looking ahead
+        alpha : int
+            The best score that player '1' can achieve
+        beta : int
+            The best score that player '2' can achieve
+        player : str
+            The player to move after the move, the opponent of the player
+            that made it
+        ply : int
+            The number of moves made since the root of the search
+        first : bool
+            Whether this is the first column searched, which gets the full
+            window
+
+        Returns
+        -------
+        int
+            The score of the board after the move
+        """
+
+        search = self.principal_variation_search
+
+        if first:
+            return search(depth, alpha, beta, player, ply)[0]
+
+        # Check with a null window that the move does not beat the best score
+        # of the player that made it
+        if player == '2':
+            current_eval = search(depth, alpha, alpha + 1, player, ply)[0]
+        else:
+            current_eval = search(depth, beta - 1, beta, player, ply)[0]
+
+        # It does, so search it again to get its real score
+        if alpha < current_eval < beta:
+            current_eval = search(depth, alpha, beta, player, ply)[0]
+
+        return current_eval
+
+    def probe_table(self, key, depth, alpha, beta):
+        """Looks up the board in the transposition table
+
+        Parameters
+        ----------
+        key : int
+            The key computed by table_key
+        depth : int
+            The depth the board is going to be searched to
+        alpha : int
+            The best score that player '1' can achieve
+        beta : int
+            The best score that player '2' can achieve
+
+        Returns
+        -------
+        tuple of int or None, int, int and int
+            A tuple containing (score, column, alpha, beta):
+            score is not None if the entry makes the search unnecessary,
+            column is the best column saved in the entry or -1,
+            alpha and beta are narrowed by the entry if it was deep enough
+        """
+
+        entry = self.table.probe(key)
+        if entry is None:
+            return None, -1, alpha, beta
+
+        col = self.table_column(entry[4])
+
+        # Shallower entries only help with move ordering
+        if entry[1] >= depth:
+            bound = entry[3]
+            if bound == EXACT:
+                return entry[2], col, alpha, beta
+            elif bound == LOWER:
+                alpha = max(alpha, entry[2])
+            else:
+                beta = min(beta, entry[2])
+
+            if beta <= alpha:
+                return entry[2], col, alpha, beta
+
+        return None, col, alpha, beta
+
+    def tactical_moves(self, player, moves, depth):
+        """Looks for immediate wins and forced blocks before searching moves
+
+        Only moves that a search of the same depth would also reject are
+        removed, so the score of the search does not change:
+            - A move that wins right away is the best move
+            - When the opponent could win with their next token, only the
+              column that blocks it can avoid the loss
+            - A move that lets the opponent win on top of it loses
+        A loss is only seen by a search that looks at least 2 moves ahead,
+        so nothing is checked with less depth left.
+
+        Parameters
+        ----------
+        player : str
+            The player that is about to move
+        moves : list of int
+            The open columns in the order they should be searched
+        depth : int
+            The depth (or number of moves) that is left to search
+
+        Returns
+        -------
+        tuple of int and list of int
+            A tuple containing (column, moves): column wins right away, -1
+            if no column does, and moves are the columns still worth
+            searching in the same order
+        """
+
+        # Near the leaves the checks cost more than the nodes they save
+        if depth < 2:
+            return -1, moves
+
+        position = self.position
+        index = PLAYER_INDEX[player]
+        columns = position.column_masks
+        playable = position.playable()
+
+        # Win with the next token if possible
+        wins = position.winning_positions(index) & playable
+        if wins:
+            for col in moves:
+                if wins & columns[col]:
+                    return col, [col]
+
+        # Block the opponent, if they have two ways of winning any block
+        # loses so only the first is searched
+        threats = position.winning_positions(1 - index)
+        if threats & playable:
+            for col in moves:
+                if threats & playable & columns[col]:
+                    return -1, [col]
+
+        # Do not play under a position where the opponent would win, unless
+        # every move does
+        losing = (threats >> 1) & playable
+        if losing:
+            safe = [col for col in moves if not losing & columns[col]]
+            return -1, safe or moves
+
+        return -1, moves
+
+    def ordered_moves(self, player, ply, table_move=-1):
+        """Orders the open columns so that the best ones are searched first
+
+        Columns are ordered by:
+            1. The best column saved in the transposition table
+            2. The killer moves that caused a cutoff at the same ply
+            3. The history score of the position the token would land in
+            4. The static order in self.order for any remaining ties
+
+        Parameters
+        ----------
+        player : str
+            The player that is about to move
+        ply : int
+            The number of moves made since the root of the search
+        table_move : int
+            The best column from the transposition table, -1 if none
+
+        Returns
+        -------
+        list of int
+            The open columns in the order they should be searched
+        """
+
+        killers = self.killers[ply]
+        history = self.history[PLAYER_INDEX[player]]
+        heights = self.position.heights
+        stride = self.position.stride
+
+        def priority(col):
+            if col == table_move:
+                return 0, 0
+            if col == killers[0]:
+                return 1, 0
+            if col == killers[1]:
+                return 2, 0
+            return 3, -history[col * stride + heights[col]]
+
+        # sorted is stable so ties keep the order of self.order
+        moves = [col for col in self.order if heights[col] < self.height]
+        return sorted(moves, key=priority)
+
+    def record_cutoff(self, player, ply, col, depth):
+        """Updates the killer moves and history after a cutoff
+
+        Parameters
+        ----------
+        player : str
+            The player that made the move
+        ply : int
+            The number of moves made since the root of the search
+        col : int
+            The column that caused the cutoff, already removed from the board
+        depth : int
+            The depth that was left to search, deeper cutoffs count more
+        """
+
+        # Keep the two most recent killer moves of this ply
+        killers = self.killers[ply]
+        if killers[0] != col:
+            killers[1] = killers[0]
+            killers[0] = col
+
+        # The token was removed so the column height is where it landed
+        cell = col * self.position.stride + self.position.heights[col]
+        self.history[PLAYER_INDEX[player]][cell] += depth * depth
+
+    def start_search(self):
+        """Resets the statistics and move ordering data before a new search
+
+        The killer moves only make sense for the board they were found on
+        and are cleared. The history scores are halved so that they keep
+        helping without outweighing what the new search finds.
+        """
+
+        self.nodes = 0
+        plies = self.width * self.height + 1
+        self.killers = [[-1, -1] for ply in range(plies)]
+        for scores in self.history:
+            for cell in range(len(scores)):
+                scores[cell] //= 2
+
+    def table_key(self, player):
+        """Computes the transposition table key of the board
+
+        A board and its mirror image have the same key, so that the tables
+        and the opening book store them once. Columns saved with the key
+        must go through table_column.
+
+        Parameters
+        ----------
+        player : str
+            The player that is about to move
+
+        Returns
+        -------
+        int
+            The smaller Zobrist hash of the board and of its mirror image,
+            mixed with the side to move
+        """
+
+        position = self.position
+        key = min(position.hash, position.mirror_hash)
+        if player == '2':
+            return key ^ position.side_key
+        return key
+
+    def table_column(self, col):
+        """Translates a column between the board and the key of table_key
+
+        Mirroring twice gives back the same column, so this translates the
+        columns that are saved as well as the ones that are looked up.
+
+        Parameters
+        ----------
+        col : int
+            The column on one side, -1 for no column
+
+        Returns
+        -------
+        int
+            The column on the other side, which is the mirrored column if
+            the key is the one of the mirror image
+        """
+
+        if col >= 0 and self.position.is_mirrored():
+            return self.width - 1 - col
+        return col
+
+    def store_result(self, key, depth, score, col, alpha, beta):
+        """Saves the result of a search in the transposition table
+
+        Parameters
+        ----------
+        key : int
+            The key computed by table_key
+        depth : int
+            The depth that was searched
+        score : int
+            The score returned by the search
+        col : int
+            The best column found by the search
+        alpha : int
+            The value of alpha the search started with
+        beta : int
+            The value of beta the search started with
+        """
+
+        self.table.store(key, depth, score, bound_of(score, alpha, beta),
+                         self.table_column(col))
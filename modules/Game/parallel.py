@@ -0,0 +1,207 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from .game import Game, OPPONENT
+
+# State of each worker process, set up by _start_worker
+_shared_score = None
+_worker_game = None
+
+
+def _start_worker(shared_score):
+    """Saves the score shared by every worker in the worker process
+
+    Parameters
+    ----------
+    shared_score : multiprocessing.Value
+        The best score found so far for the player to move at the root
+    """
+
+    global _shared_score
+    _shared_score = shared_score
+
+
+def _search_column(board, player, col, depth, driver, table_mb, connect,
+                   evaluation):
+    """Searches one column of the root in a worker process
+
+    The game of the worker is kept between calls so that it is only built
+    once, but it forgets everything it found before: a worker searches
+    whichever column is next when it becomes free, so reusing its
+    transposition table or its move ordering data would make the score
+    depend on the order the workers happened to run in.
+
+    Parameters
+    ----------
+    board : list of list of str
+        The board of the root, as returned by Game.board
+    player : str
+        The player that is about to move at the root
+    col : int
+        The column to search
+    depth : int
+        The depth (or number of moves) to look ahead from the root
+    driver : str
+        The search driver of the root game
+    table_mb : int or float
+        The memory cap of the worker's transposition table
+    connect : int
+        The number of tokens in a line that wins the game
+    evaluation : str
+        The evaluation of the root game
+
+    Returns
+    -------
+    int
+        The score of the column. A score that is worse than the best score
+        shared by the other workers when the search started is only a bound
+    """
+
+    global _worker_game
+
+    height = len(board)
+    width = len(board[0])
+    if (_worker_game is None or _worker_game.width != width
+            or _worker_game.height != height
+            or _worker_game.connect != connect):
+        _worker_game = Game(width, height, table_mb=table_mb,
+                            connect=connect)
+
+    game = _worker_game
+    if game.evaluation != evaluation:
+        game.set_evaluation(evaluation)
+    game.load_board(board)
+
+    # Start every column from the same empty tables
+    game.table.clear()
+    for scores in game.history:
+        scores[:] = [0] * len(scores)
+
+    game.search_driver = driver
+    game.start_search()
+
+    # Only an exact score that is at least as good as the best score so far
+    # matters, anything worse can be cut off
+    best = _shared_score.value
+    if player == '1':
+        alpha, beta = best - 1, 999999
+    else:
+        alpha, beta = -999999, best + 1
+
+    opponent = OPPONENT[player]
+    game.add_token(col, player, True)
+    if driver == 'pvs':
+        score = game.principal_variation_search(depth - 1, alpha, beta,
+                                                opponent, 1)[0]
+    else:
+        score = game.alpha_beta_pruning(col, depth - 1, alpha, beta,
+                                        game.board_score, opponent, 1)[0]
+
+    # Share the score with the workers that have not started yet
+    with _shared_score.get_lock():
+        if player == '1' and score > _shared_score.value:
+            _shared_score.value = score
+        elif player == '2' and score < _shared_score.value:
+            _shared_score.value = score
+
+    return score
+
+
+class ParallelSearch:
+    """This class searches the columns of the root in several processes.
+
+    The columns are first filtered by Game.tactical_moves like in
+    Game.search_root, then every column left is sent to a process pool. The
+    workers share the best score found so far and each search starts with a
+    window narrowed to it. A column that cannot beat that score fails low,
+    which can only make its score worse, never better. Every column is
+    searched from empty tables, so the merged result only depends on the
+    board, not on which worker searched which column or finished first.
+    Searching the same board again always gives the same column and score.
+    A single process search shares its table between the columns, so it
+    may find a different score, and then possibly a different column, in
+    rare positions.
+
+    Attributes
+    ----------
+    workers : int
+        The number of worker processes
+    table_mb : int or float
+        The memory cap of the transposition table of each worker
+    """
+
+    def __init__(self, workers=None, table_mb=16):
+        """Constructor for a ParallelSearch object
+
+        Parameters
+        ----------
+        workers : int or None
+            The number of worker processes, None for one per CPU
+        table_mb : int or float
+            The memory cap of the transposition table of each worker
+        """
+
+        self.workers = workers or multiprocessing.cpu_count()
+        self.table_mb = table_mb
+
+        self.shared_score = multiprocessing.Value('i', 0)
+        self.executor = ProcessPoolExecutor(self.workers,
+                                            initializer=_start_worker,
+                                            initargs=(self.shared_score,))
+
+    def search(self, game, player, depth):
+        """Searches every column of game's board in parallel
+
+        Parameters
+        ----------
+        game : Game
+            The game to search, its board is not changed
+        player : str
+            The player that is about to move
+        depth : int
+            The depth (or number of moves) to look ahead, at least 1
+
+        Returns
+        -------
+        tuple of int and int
+            A tuple containing (score, column) of the best column to play,
+            column is -1 if no column can be played
+        """
+
+        # Start from the worst possible score for the player
+        worst = -999999 if player == '1' else 999999
+        self.shared_score.value = worst
+
+        # Win right away or skip the columns that lose right away, the same
+        # way as Game.search_root
+        columns = [col for col in game.order if game.allows_move(col)]
+        winning_col, columns = game.tactical_moves(player, columns, depth)
+        if winning_col >= 0:
+            return (999998 if player == '1' else -999998), winning_col
+
+        board = game.board
+        futures = [self.executor.submit(_search_column, board, player, col,
+                                        depth, game.search_driver,
+                                        self.table_mb, game.connect,
+                                        game.evaluation)
+                   for col in columns]
+
+        # Merge in the order of the columns so that ties are broken the same
+        # way as in Game.search_root
+        best_score = worst
+        best_col = -1
+        for col, future in zip(columns, futures):
+            score = future.result()
+            if player == '1' and score > best_score:
+                best_score = score
+                best_col = col
+            elif player == '2' and score < best_score:
+                best_score = score
+                best_col = col
+
+        return best_score, best_col
+
+    def close(self):
+        """Shuts down the worker processes"""
+
+        self.executor.shutdown()
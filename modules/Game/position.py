@@ -0,0 +1,529 @@
+import copy
+import random
+
+# Seed for the Zobrist keys so that hashes are the same in every process
+ZOBRIST_SEED = 20200415
+
+
+class Position:
+    """This class stores the tokens of a Connect4 board as integer bitboards.
+
+    Each player's tokens are kept in a single integer. Every column uses
+    height + 1 bits, one bit per row (starting from the bottom) plus an empty
+    sentinel bit on top so that shifting a line never wraps into the next
+    column. The cell that is r rows above the bottom of column c is stored in
+    bit c * (height + 1) + r.
+
+    Rows that are passed in or returned by this class use the same convention
+    as Game: row 0 is the top row and row height - 1 is the bottom row.
+
+    Attributes
+    ----------
+    width : int
+        Number of columns of the board
+    height : int
+        Number of rows of the board
+    connect : int
+        The number of tokens in a line that wins the game
+    stones : list of int
+        The bitboards of each player, index 0 for '1' and 1 for '2'
+    mask : int
+        A bitboard of every occupied position
+    heights : list of int
+        The number of tokens in each column
+    moves : int
+        The total number of tokens on the board
+    hash : int
+        The Zobrist hash of the tokens, updated by play and remove
+    mirror_hash : int
+        The Zobrist hash of the mirror image of the tokens (the columns
+        swapped left to right), updated along with hash
+    keys : list of list of int
+        The random 64-bit Zobrist key of each player for each bit
+    mirror_keys : list of list of int
+        The Zobrist key of the mirrored bit, for each player and bit
+    side_key : int
+        A Zobrist key that callers can mix in when player '2' is to move
+    won : list of bool
+        Whether each player has a winning line, kept up to date by play and
+        remove so that checking for a winner never scans the board
+    threats : ThreatCounter or None
+        Counts the tokens of every line as they are played and removed,
+        None unless the threat evaluation is used
+    """
+
+    def __init__(self, width=7, height=6, connect=4):
+        """Constructor for a Position object
+
+        Parameters
+        ----------
+        width : int
+            Number of columns of the board
+        height : int
+            Number of rows of the board
+        connect : int
+            The number of tokens in a line that wins the game
+        """
+
+        self.width = width
+        self.height = height
+        self.connect = connect
+
+        # The number of bits used by a single column (including the sentinel)
+        self.stride = height + 1
+
+        # Bit distance between neighbours in the vertical, horizontal and
+        # both diagonal directions
+        self.directions = (1, self.stride, self.stride - 1, self.stride + 1)
+
+        # The bottom position of every column, the positions of each column
+        # and every position of the board, without the sentinel bits
+        self.bottom = sum(1 << col * self.stride for col in range(width))
+        self.column_masks = [((1 << height) - 1) << col * self.stride
+                             for col in range(width)]
+        self.board_mask = self.bottom * ((1 << height) - 1)
+
+        # Draw the Zobrist keys from a fixed seed so that they only depend
+        # on the dimensions of the board
+        generator = random.Random(ZOBRIST_SEED)
+        bits = width * self.stride
+        self.keys = [[generator.getrandbits(64) for i in range(bits)]
+                     for player in range(2)]
+        self.side_key = generator.getrandbits(64)
+
+        # The bit of row r in column c is in column width - 1 - c of the
+        # mirror image
+        self.mirror_keys = [[keys[(width - 1 - bit // self.stride) *
+                                  self.stride + bit % self.stride]
+                             for bit in range(bits)]
+                            for keys in self.keys]
+
+        self.threats = None
+        self.reset()
+
+    def reset(self):
+        """Removes every token from the position"""
+
+        self.stones = [0, 0]
+        self.mask = 0
+        self.heights = [0] * self.width
+        self.moves = 0
+        self.hash = 0
+        self.mirror_hash = 0
+        self.won = [False, False]
+
+        if self.threats is not None:
+            self.threats.reset()
+
+    def copy(self):
+        """Creates an independent copy of the position
+
+        The Zobrist keys are shared since they never change.
+
+        Returns
+        -------
+        Position
+            A position with the same tokens
+        """
+
+        other = copy.copy(self)
+        other.stones = self.stones[:]
+        other.heights = self.heights[:]
+        other.won = self.won[:]
+        if self.threats is not None:
+            other.threats = self.threats.copy()
+
+        return other
+
+    def snapshot(self):
+        """Saves the tokens so that they can be restored later
+
+        Only integers and tuples are saved, so the snapshot never changes
+        and costs about as much as a copy of the heights.
+
+        Returns
+        -------
+        tuple
+            Everything restore needs to put the tokens back
+        """
+
+        threats = None if self.threats is None else self.threats.snapshot()
+
+        return (self.stones[0], self.stones[1], self.mask,
+                tuple(self.heights), self.moves, self.hash, self.mirror_hash,
+                self.won[0], self.won[1], threats)
+
+    def restore(self, state):
+        """Puts back the tokens saved by snapshot
+
+        Parameters
+        ----------
+        state : tuple
+            A tuple returned by snapshot of a position of the same size. The
+            threats are only restored if they were counted when the snapshot
+            was taken and still are
+        """
+
+        stones_1, stones_2, self.mask, heights, self.moves, self.hash, \
+            self.mirror_hash, won_1, won_2, threats = state
+
+        self.stones = [stones_1, stones_2]
+        self.heights = list(heights)
+        self.won = [won_1, won_2]
+        if threats is not None and self.threats is not None:
+            self.threats.restore(threats)
+
+    def cell(self, row, col):
+        """Returns the content of a position using the characters of Game
+
+        Parameters
+        ----------
+        row : int
+            The row of the position, 0 being the top row
+        col : int
+            The col[umn] of the position
+
+        Returns
+        -------
+        str
+            ' ' if the position is empty, '1' or '2' for a player's token
+        """
+
+        bit = 1 << (col * self.stride + self.height - 1 - row)
+
+        if self.stones[0] & bit:
+            return '1'
+        if self.stones[1] & bit:
+            return '2'
+
+        return ' '
+
+    def can_play(self, col):
+        """Determines if there is an open spot in col[umn]
+
+        Parameters
+        ----------
+        col : int
+            The column to check, must be in bounds
+
+        Returns
+        -------
+        bool
+            True if the column is not full, False if otherwise
+        """
+
+        return self.heights[col] < self.height
+
+    def play(self, col, player):
+        """Drops a token for player in col[umn]
+
+        Parameters
+        ----------
+        col : int
+            The column to play in
+            Precondition: can_play(col) returns True
+        player : int
+            The index of the player, 0 for '1' and 1 for '2'
+
+        Returns
+        -------
+        int
+            The row the token was inserted in
+        """
+
+        height = self.heights[col]
+        index = col * self.stride + height
+        bit = 1 << index
+
+        if self.threats is not None:
+            self.threats.play(index, player, self.mask)
+
+        self.stones[player] |= bit
+        self.mask |= bit
+        self.heights[col] = height + 1
+        self.moves += 1
+        self.hash ^= self.keys[player][index]
+        self.mirror_hash ^= self.mirror_keys[player][index]
+
+        # Only the lines going through the new token can have become a win
+        if not self.won[player]:
+            self.won[player] = self.completes_line(bit, self.stones[player])
+
+        return self.height - 1 - height
+
+    def remove(self, col):
+        """Removes the top token of col[umn], whichever player it belongs to
+
+        Parameters
+        ----------
+        col : int
+            The column to remove the token from
+
+        Returns
+        -------
+        int
+            The row that the token was removed from, -1 if col is empty
+        """
+
+        height = self.heights[col] - 1
+        if height < 0:
+            return -1
+
+        index = col * self.stride + height
+        bit = 1 << index
+
+        # Clear the bit from the player that owns it
+        player = 0 if self.stones[0] & bit else 1
+        if self.threats is not None:
+            self.threats.remove(index, player, self.mask)
+
+        self.stones[player] ^= bit
+        self.mask ^= bit
+        self.heights[col] = height
+        self.moves -= 1
+        self.hash ^= self.keys[player][index]
+        self.mirror_hash ^= self.mirror_keys[player][index]
+
+        # The token may have been part of the player's only winning line
+        if self.won[player]:
+            self.won[player] = self.has_line(player)
+
+        return self.height - 1 - height
+
+    def is_mirrored(self):
+        """Determines if the canonical form of the board is its mirror image
+
+        A board and its mirror image have the same results, so caches are
+        keyed by the smaller of the two hashes. The columns saved with a
+        mirrored key are those of the mirror image.
+
+        Returns
+        -------
+        bool
+            True if the mirror image has the smaller hash, False if otherwise
+        """
+
+        return self.mirror_hash < self.hash
+
+    def top_player(self, col):
+        """Determines which player owns the top token of col[umn]
+
+        Parameters
+        ----------
+        col : int
+            The column to check
+
+        Returns
+        -------
+        int
+            The index of the player, -1 if the column is empty
+        """
+
+        height = self.heights[col] - 1
+        if height < 0:
+            return -1
+
+        if self.stones[0] & (1 << (col * self.stride + height)):
+            return 0
+        return 1
+
+    def is_winning_move(self, col, player):
+        """Determines if playing col[umn] would give player a winning line
+
+        Parameters
+        ----------
+        col : int
+            The column to check
+            Precondition: can_play(col) returns True
+        player : int
+            The index of the player, 0 for '1' and 1 for '2'
+
+        Returns
+        -------
+        bool
+            True if the move wins the game, False if otherwise
+        """
+
+        bit = 1 << (col * self.stride + self.heights[col])
+        return self.completes_line(bit, self.stones[player] | bit)
+
+    def playable(self):
+        """Computes the positions a token can be dropped in
+
+        Returns
+        -------
+        int
+            A bitboard of the lowest empty position of every open column
+        """
+
+        return (self.mask + self.bottom) & self.board_mask
+
+    def winning_positions(self, player):
+        """Computes every empty position that would complete a line
+
+        For each direction, the positions that have k tokens of player in a
+        row right after them (and right before them) are found by shifting
+        the bitboard k times. A position wins if it has k tokens on one side
+        and connect - 1 - k on the other.
+
+        Parameters
+        ----------
+        player : int
+            The index of the player, 0 for '1' and 1 for '2'
+
+        Returns
+        -------
+        int
+            A bitboard of the empty positions, playable or not, where a
+            token of player would win the game
+        """
+
+        stones = self.stones[player]
+        connect = self.connect
+        positions = 0
+
+        for shift in self.directions:
+            # after[k] and before[k] have the positions that are followed
+            # and preceded by k tokens, -1 has every bit set
+            after = [-1]
+            before = [-1]
+            for k in range(1, connect):
+                after.append(after[-1] & (stones >> k * shift))
+                before.append(before[-1] & (stones << k * shift))
+
+            for k in range(connect):
+                positions |= after[k] & before[connect - 1 - k]
+
+        return positions & self.board_mask & ~self.mask
+
+    def is_winning_above(self, col, player):
+        """Determines if player could win with the token after the next one
+
+        Playing col[umn] lets the opponent drop a token right above it, so a
+        move that makes this return True for the opponent hands them a win.
+
+        Parameters
+        ----------
+        col : int
+            The column to check
+            Precondition: can_play(col) returns True
+        player : int
+            The index of the player, 0 for '1' and 1 for '2'
+
+        Returns
+        -------
+        bool
+            True if a token of player above the next one would win the game,
+            False if otherwise or if the column would be full
+        """
+
+        height = self.heights[col] + 1
+        if height >= self.height:
+            return False
+
+        bit = 1 << (col * self.stride + height)
+        return self.completes_line(bit, self.stones[player] | bit)
+
+    def is_full(self):
+        """Determines if every position of the board is occupied
+
+        Returns
+        -------
+        bool
+            True if no more tokens can be played, False if otherwise
+        """
+
+        return self.moves == self.width * self.height
+
+    def is_game_over(self):
+        """Determines if a player has won or if the board is full
+
+        Returns
+        -------
+        bool
+            True if no more moves should be made, False if otherwise
+        """
+
+        return self.won[0] or self.won[1] or self.is_full()
+
+    def completes_line(self, bit, stones):
+        """Determines if the token at bit is part of a winning line in stones
+
+        Only the four lines going through bit are walked, in both directions,
+        until a position that is not in stones is reached. The sentinel bits
+        and the bits above the board are never set so a walk cannot wrap.
+
+        Parameters
+        ----------
+        bit : int
+            A bitboard with only the position of the token set
+        stones : int
+            The bitboard of the player that owns the token
+
+        Returns
+        -------
+        bool
+            True if the token is part of a line of at least connect tokens,
+            False if otherwise
+        """
+
+        for shift in self.directions:
+            count = 1
+
+            # Walk backwards along the line
+            step = bit >> shift
+            while step & stones:
+                count += 1
+                step >>= shift
+
+            # Walk forwards along the line
+            step = bit << shift
+            while step & stones:
+                count += 1
+                step <<= shift
+
+            if count >= self.connect:
+                return True
+
+        return False
+
+    def has_line(self, player):
+        """Determines if player has a winning line anywhere on the board
+
+        Each direction is checked by doubling the length of the runs kept:
+        runs of n tokens shifted by n steps and combined with themselves
+        give the runs of 2n tokens. For 4 in a row this is two shifts, the
+        first one keeps the tokens that have a neighbour in that direction,
+        the second one keeps the pairs of those that are two steps apart.
+
+        Parameters
+        ----------
+        player : int
+            The index of the player, 0 for '1' and 1 for '2'
+
+        Returns
+        -------
+        bool
+            True if player has a line of at least connect tokens, False if
+            otherwise
+        """
+
+        stones = self.stones[player]
+
+        # Vertical, horizontal and the two diagonal directions
+        for shift in self.directions:
+            # Each bit of runs starts a run of length tokens
+            runs = stones
+            length = 1
+            while length * 2 <= self.connect:
+                runs &= runs >> (length * shift)
+                length *= 2
+
+            # Add the tokens that are still missing
+            if length < self.connect:
+                runs &= runs >> ((self.connect - length) * shift)
+
+            if runs:
+                return True
+
+        return False
@@ -0,0 +1,266 @@
+import queue
+import sys
+import threading
+import time
+
+from .game import Game
+
+
+class EngineProtocol:
+    """This class runs the engine behind a line protocol on stdin/stdout.
+
+    Every command is a single line, the engine answers with lines too:
+        position [moves]   - Starts from an empty board and plays the moves,
+                             columns counted from 0 ('3342' or '3 3 4 2')
+        go depth N         - Searches N moves ahead
+        go movetime MS     - Searches for MS milliseconds
+        go                 - Searches until stop is received
+        stop               - Stops the searches started before it, which
+                             still answer
+        eval               - Answers 'eval S' with the score of the board
+        isready            - Answers 'readyok' right away
+        newgame            - Forgets everything learned from previous games
+        quit               - Exits once the commands before it are done, a
+                             search without limits is stopped
+
+    A search answers with 'info depth D score S nodes N time MS' followed by
+    'bestmove C'. Scores are positive when player '1' is winning. Invalid
+    commands answer 'error' followed by a description.
+
+    The commands are read by one thread and carried out in order by another,
+    so that reading never waits for a search. stop, isready and quit are
+    handled as soon as they are read.
+
+    Attributes
+    ----------
+    game : Game
+        The game the engine searches, reused from one command to the next
+    output : file
+        Where the answers are written
+    commands : queue.Queue
+        The commands that were read and not carried out yet, None once
+        there are no more commands
+    thread : threading.Thread
+        The thread that carries out the commands
+    searches : int
+        The number of go commands read so far
+    stopped : int
+        The number of go commands read before the last stop
+    unlimited : bool
+        Whether the search that is running has no limit
+    quitting : bool
+        Whether quit was read, or the input ran out
+    """
+
+    def __init__(self, game=None, output=sys.stdout):
+        """Constructor for an EngineProtocol object
+
+        Parameters
+        ----------
+        game : Game or None
+            The game to search, None to create a standard 7 x 6 game
+        output : file
+            Where the answers are written
+        """
+
+        self.game = game if game is not None else Game()
+        self.output = output
+        self.lock = threading.Lock()
+
+        # The state shared by the two threads is only changed with the lock
+        self.state = threading.Lock()
+        self.searches = 0
+        self.stopped = 0
+        self.unlimited = False
+        self.quitting = False
+
+        self.commands = queue.Queue()
+        self.thread = threading.Thread(target=self.work, daemon=True)
+        self.thread.start()
+
+    def run(self, lines=None):
+        """Handles commands until quit is received or lines runs out
+
+        Parameters
+        ----------
+        lines : iterable of str or None
+            The commands, one per line, None to read them from stdin
+        """
+
+        if lines is None:
+            lines = sys.stdin
+
+        for line in lines:
+            if not self.handle(line):
+                break
+
+        self.quit()
+        self.thread.join()
+
+    def send(self, text):
+        """Writes an answer and flushes it right away
+
+        Parameters
+        ----------
+        text : str
+            The answer, without the line break
+        """
+
+        with self.lock:
+            self.output.write(text + '\n')
+            self.output.flush()
+
+    def wait(self):
+        """Waits until every command read so far has been carried out"""
+
+        self.commands.join()
+
+    def quit(self):
+        """Stops reading commands, the ones already read are still done"""
+
+        with self.state:
+            if self.quitting:
+                return
+            self.quitting = True
+
+            # A search without limits would never end
+            if self.unlimited:
+                self.game.stop()
+
+        self.commands.put(None)
+
+    def handle(self, line):
+        """Reads one command, without waiting for the search
+
+        Parameters
+        ----------
+        line : str
+            The command and its arguments
+
+        Returns
+        -------
+        bool
+            False if the command was quit, True if otherwise
+        """
+
+        words = line.split()
+        if not words:
+            return True
+
+        command = words[0]
+
+        if command == 'stop':
+            with self.state:
+                self.stopped = self.searches
+                self.game.stop()
+        elif command == 'isready':
+            self.send('readyok')
+        elif command == 'quit':
+            return False
+        else:
+            # Number the searches so that stop also reaches the ones that
+            # have not started yet
+            with self.state:
+                if command == 'go':
+                    self.searches += 1
+                self.commands.put((words, self.searches))
+
+        return True
+
+    def work(self):
+        """Carries out the commands in the order they were read
+
+        Runs in the thread until there are no more commands.
+        """
+
+        while True:
+            item = self.commands.get()
+            try:
+                if item is None:
+                    return
+                self.execute(*item)
+            finally:
+                self.commands.task_done()
+
+    def execute(self, words, search):
+        """Carries out one command
+
+        Parameters
+        ----------
+        words : list of str
+            The command and its arguments
+        search : int
+            The number of go commands read up to this one
+        """
+
+        command = words[0]
+
+        if command == 'position':
+            self.game.reset_board()
+            try:
+                self.game.play_moves(' '.join(words[1:]))
+            except ValueError as error:
+                self.send('error ' + str(error))
+        elif command == 'go':
+            self.go(words[1:], search)
+        elif command == 'eval':
+            self.send('eval ' + str(self.game.board_score))
+        elif command == 'newgame':
+            self.game.reset_board()
+            self.game.table.clear()
+            self.game.solver_table.clear()
+        else:
+            self.send('error unknown command ' + command)
+
+    def go(self, arguments, search):
+        """Searches the board and sends the result
+
+        Parameters
+        ----------
+        arguments : list of str
+            The words after go
+        search : int
+            The number of the go command
+        """
+
+        if self.game.is_game_over():
+            self.send('error the game is over')
+            return
+
+        time_limit = None
+        max_depth = None
+        try:
+            if arguments[:1] == ['depth']:
+                max_depth = int(arguments[1])
+            elif arguments[:1] == ['movetime']:
+                time_limit = int(arguments[1]) / 1000
+            elif arguments:
+                raise ValueError()
+        except (IndexError, ValueError):
+            self.send('error expected go depth N or go movetime MS')
+            return
+
+        # Without a limit the search only ends when stop is received
+        unlimited = time_limit is None and max_depth is None
+        if unlimited:
+            max_depth = self.game.width * self.game.height
+
+        # A stop or a quit may have been read before the search started
+        with self.state:
+            self.unlimited = unlimited
+            self.game.stop_requested = (search <= self.stopped or
+                                        (unlimited and self.quitting))
+
+        game = self.game
+        start = time.monotonic()
+        col = game.determine_ai_move(game.curr_player, time_limit, max_depth)
+        elapsed = int((time.monotonic() - start) * 1000)
+
+        with self.state:
+            self.unlimited = False
+
+        self.send('info depth ' + str(game.last_depth) +
+                  ' score ' + str(game.last_score) +
+                  ' nodes ' + str(game.nodes) +
+                  ' time ' + str(elapsed))
+        self.send('bestmove ' + str(col))
@@ -0,0 +1,344 @@
+import asyncio
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .game import Game
+
+# The game of each worker (process or thread), kept between moves so that
+# its transposition table is reused
+_worker = threading.local()
+
+
+def _bot_move(board, player, time_limit, max_depth):
+    """Searches for the bot's column in a worker of the pool
+
+    Parameters
+    ----------
+    board : list of list of str
+        The board of the session, as returned by Game.board
+    player : str
+        The player the bot is representing
+    time_limit : float
+        The number of seconds the search may take
+    max_depth : int or None
+        The deepest search to run, None for no limit
+
+    Returns
+    -------
+    tuple of int and float
+        A tuple containing (column, seconds spent searching)
+    """
+
+    height = len(board)
+    width = len(board[0])
+    game = getattr(_worker, 'game', None)
+    if game is None or game.width != width or game.height != height:
+        game = _worker.game = Game(width, height)
+
+    start = time.monotonic()
+    game.load_board(board)
+    col = game.determine_ai_move(player, time_limit, max_depth)
+
+    return col, time.monotonic() - start
+
+
+class Session:
+    """This class stores one game between a client and the bot.
+
+    Attributes
+    ----------
+    game : Game
+        The board of the session, it is never searched so its tables are
+        kept as small as possible
+    bot : str
+        The player the bot is representing, '1' or '2'
+    budget : float
+        The number of seconds the bot may still spend searching in this game
+    lock : asyncio.Lock
+        Makes the messages of a session be handled one at a time
+    """
+
+    def __init__(self, bot, budget):
+        """Constructor for a Session object
+
+        Parameters
+        ----------
+        bot : str
+            The player the bot is representing, '1' or '2'
+        budget : float
+            The number of seconds the bot may spend searching in this game
+        """
+
+        self.game = Game(table_mb=0)
+        self.bot = bot
+        self.budget = budget
+        self.lock = asyncio.Lock()
+
+
+class MatchServer:
+    """This class hosts many games between clients and the bot.
+
+    Clients connect over TCP and send one JSON object per line, the server
+    answers each with one JSON object per line:
+        {"op": "new", "bot": "2"}       - Starts a game, the bot plays "2"
+                                          (the default) or "1"
+        {"op": "move", "session": S, "column": C}
+                                        - Plays the client's move and the
+                                          bot's answer
+        {"op": "state", "session": S}   - Describes the game
+        {"op": "close", "session": S}   - Ends the game
+    Games are described by their "session", the "moves" played so far,
+    "winner" ('-1' while playing, then '1', '2' or 'Draw!'), the "bot_move"
+    played in answer if any and the "budget" of seconds the bot has left.
+    Invalid messages are answered with {"error": description}. A client
+    can only play in the games it started, which are closed when it
+    disconnects.
+
+    The bot searches in a process pool so that the event loop is never
+    blocked. Each move may take up to move_time seconds, and all the moves
+    of a game up to budget seconds. Once the budget is spent the bot only
+    looks one move ahead.
+
+    Attributes
+    ----------
+    move_time : float
+        The number of seconds a single move may take
+    budget : float
+        The number of seconds the bot may spend searching in a game
+    max_depth : int or None
+        The deepest search the bot runs, None for no limit
+    max_sessions : int
+        The number of games that may be played at the same time
+    sessions : dict of int and Session
+        The games that are being played
+    executor : concurrent.futures.Executor
+        The pool the bot's searches run in
+    """
+
+    def __init__(self, move_time=1.0, budget=30.0, max_depth=None,
+                 max_sessions=1000, executor=None):
+        """Constructor for a MatchServer object
+
+        Parameters
+        ----------
+        move_time : float
+            The number of seconds a single move may take
+        budget : float
+            The number of seconds the bot may spend searching in a game
+        max_depth : int or None
+            The deepest search the bot runs, None for no limit
+        max_sessions : int
+            The number of games that may be played at the same time
+        executor : concurrent.futures.Executor or None
+            The pool to search in, None for a process pool with one worker
+            per CPU
+        """
+
+        self.move_time = move_time
+        self.budget = budget
+        self.max_depth = max_depth
+        self.max_sessions = max_sessions
+        self.sessions = {}
+        self.executor = executor or ProcessPoolExecutor()
+        self.session_ids = itertools.count(1)
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=0):
+        """Starts listening for clients
+
+        Parameters
+        ----------
+        host : str
+            The address to listen on
+        port : int
+            The port to listen on, 0 to pick a free one
+
+        Returns
+        -------
+        int
+            The port the server is listening on
+        """
+
+        self.server = await asyncio.start_server(self.handle_client, host,
+                                                 port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """Stops listening and shuts down the process pool"""
+
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown()
+
+    async def handle_client(self, reader, writer):
+        """Answers the messages of a client until it disconnects
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+            The stream the messages are read from
+        writer : asyncio.StreamWriter
+            The stream the answers are written to
+        """
+
+        # The sessions started by this client, which end with its connection
+        owned = set()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                try:
+                    answer = await self.handle_message(json.loads(line),
+                                                       owned)
+                except (ValueError, KeyError, TypeError) as error:
+                    answer = {'error': str(error)}
+
+                writer.write(json.dumps(answer).encode() + b'\n')
+                await writer.drain()
+        finally:
+            for session_id in owned:
+                self.sessions.pop(session_id, None)
+            writer.close()
+
+    async def handle_message(self, message, owned=None):
+        """Handles one message
+
+        Parameters
+        ----------
+        message : dict
+            The decoded message
+        owned : set of int or None
+            The sessions started by the client, updated when one is started
+            or closed. If given, the other sessions cannot be used
+
+        Returns
+        -------
+        dict
+            The answer to send back
+
+        Raises
+        ------
+        ValueError
+            If the message is invalid, or its session does not exist or was
+            started by another client
+        KeyError
+            If the message is missing a field
+        """
+
+        op = message['op']
+
+        if op == 'new':
+            if len(self.sessions) >= self.max_sessions:
+                raise ValueError('too many sessions')
+
+            bot = message.get('bot', '2')
+            if bot not in ('1', '2'):
+                raise ValueError('bot must be "1" or "2"')
+
+            session_id = next(self.session_ids)
+            session = Session(bot, self.budget)
+            self.sessions[session_id] = session
+            if owned is not None:
+                owned.add(session_id)
+
+            async with session.lock:
+                bot_move = await self.play_bot(session)
+                return self.describe(session_id, session, bot_move)
+
+        # Session ids are easy to guess, a client may only use its own
+        session_id = message['session']
+        session = self.sessions.get(session_id)
+        if session is None or (owned is not None and
+                               session_id not in owned):
+            raise ValueError('unknown session ' + str(session_id))
+
+        if op == 'move':
+            async with session.lock:
+                game = session.game
+                col = message['column']
+                if game.is_game_over():
+                    raise ValueError('the game is over')
+                if game.curr_player == session.bot:
+                    raise ValueError('it is the bot\'s turn')
+                if not isinstance(col, int) or not game.allows_move(col):
+                    raise ValueError('cannot play in column ' + str(col))
+
+                game.add_token(col, game.curr_player)
+                bot_move = await self.play_bot(session)
+                return self.describe(session_id, session, bot_move)
+        elif op == 'state':
+            async with session.lock:
+                return self.describe(session_id, session, None)
+        elif op == 'close':
+            del self.sessions[session_id]
+            if owned is not None:
+                owned.discard(session_id)
+            return {'session': session_id, 'closed': True}
+
+        raise ValueError('unknown op ' + str(op))
+
+    async def play_bot(self, session):
+        """Plays the bot's move if it is its turn
+
+        Parameters
+        ----------
+        session : Session
+            The session to play in, its lock must be held
+
+        Returns
+        -------
+        int or None
+            The column the bot played, None if it did not play
+        """
+
+        game = session.game
+        if game.is_game_over() or game.curr_player != session.bot:
+            return None
+
+        # A search of 0 seconds still completes a depth of one move
+        time_limit = max(0.0, min(self.move_time, session.budget))
+
+        loop = asyncio.get_running_loop()
+        col, elapsed = await loop.run_in_executor(self.executor, _bot_move,
+                                                  game.board, session.bot,
+                                                  time_limit, self.max_depth)
+
+        session.budget = max(0.0, session.budget - elapsed)
+        game.add_token(col, game.curr_player)
+
+        return col
+
+    def describe(self, session_id, session, bot_move):
+        """Builds the answer that describes a session
+
+        Parameters
+        ----------
+        session_id : int
+            The id of the session
+        session : Session
+            The session to describe
+        bot_move : int or None
+            The column the bot just played, None if it did not play
+
+        Returns
+        -------
+        dict
+            The description of the session
+        """
+
+        game = session.game
+        game.is_game_over()
+
+        return {'session': session_id,
+                'moves': list(game.moves_made),
+                'bot': session.bot,
+                'bot_move': bot_move,
+                'winner': game.winner,
+                'budget': round(session.budget, 3)}
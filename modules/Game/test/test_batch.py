@@ -0,0 +1,66 @@
+import io
+import json
+import pytest
+import sys
+sys.path.insert(0, "..")
+
+import Game.batch as batch  # noqa: E402
+import Game.game as game  # noqa: E402
+
+
+def test_analyze():
+    """Tests the analysis of single positions"""
+
+    result = batch.analyze('3322', 3)
+    assert result['depth'] == 3
+    assert result['nodes'] > 0
+    assert len(result['scores']) == 7
+
+    # The score of the best column agrees with a search of the same depth
+    instance = game.Game()
+    instance.play_moves('3322')
+    assert result['score'] == instance.search('1', 3)[0]
+    assert result['scores'][result['best']] == result['score']
+    assert result['pv'][0] == result['best']
+
+    # Winning right away is the best column
+    result = batch.analyze('303030', 4)
+    assert result['best'] == 3
+    assert result['scores'][3] == 999998
+
+    # Full columns have no score
+    assert batch.analyze('000000', 2)['scores'][0] is None
+
+    assert 'error' in batch.analyze('39', 2)
+    assert batch.analyze('3030303', 2) == {'moves': '3030303', 'winner': '1'}
+
+
+def test_analyze_stream():
+    """Tests that results are written in the order of the positions"""
+
+    lines = ['3\n', '\n', '33\n', '333\n', '3333\n', '9\n']
+    output = io.StringIO()
+
+    assert batch.analyze_stream(lines, output, depth=2, workers=2,
+                                pending=2) == 5
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [result['moves'] for result in results] == ['3', '33', '333',
+                                                       '3333', '9']
+    assert all(result['depth'] == 2 for result in results[:4])
+    assert 'error' in results[4]
+
+
+def test_flush():
+    """Tests that every result is flushed as soon as it is written"""
+
+    class Output(io.StringIO):
+        def flush(self):
+            self.flushed.append(self.getvalue().count('\n'))
+
+    output = Output()
+    output.flushed = []
+    batch.analyze_stream(['3\n', '33\n', '333\n'], output, depth=1,
+                         workers=1, pending=1)
+
+    assert output.flushed == [1, 2, 3]
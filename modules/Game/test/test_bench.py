@@ -0,0 +1,35 @@
+import pytest
+import sys
+sys.path.insert(0, "..")
+
+import Game.bench as bench  # noqa: E402
+
+
+def test_position_sets():
+    """Tests that the checked-in position sets can be read"""
+
+    for name in bench.POSITION_SETS:
+        positions = bench.load_positions(name)
+        fewest, most, depth = bench.POSITION_SETS[name]
+        assert len(positions) == 20
+        assert all(fewest <= len(moves) <= most for moves, score in positions)
+
+
+def test_run_set():
+    """Tests that every driver finds the known results"""
+
+    for driver in ('alphabeta', 'pvs', 'mtdf'):
+        result = bench.run_set('middle', driver, limit=3)
+        assert result['positions'] == result['correct'] == 3
+        assert result['nodes'] > 0 and 0 < result['hit_rate'] < 1
+
+    result = bench.run_set('end', limit=2)
+    assert result['correct'] == 2
+
+
+def test_run_benchmark():
+    """Tests the machine-readable results"""
+
+    results = bench.run_benchmark(['pvs'], table_mb=1, limit=1)
+    assert set(results['drivers']['pvs']) == set(bench.POSITION_SETS)
+    assert results['table_mb'] == 1
@@ -0,0 +1,56 @@
+import pytest
+import sys
+sys.path.insert(0, "..")
+
+import Game.book as book  # noqa: E402
+import Game.game as game  # noqa: E402
+
+
+def test_build_and_lookup(tmp_path):
+    """Tests that a built book returns the searched columns"""
+
+    path = str(tmp_path / 'test.book')
+
+    # The empty board and the 7 boards after the first move, of which
+    # columns 4 to 6 are the mirror images of columns 2 to 0
+    assert book.build_book(path, 1, 3) == 5
+
+    opening = book.OpeningBook(path)
+    instance = game.Game()
+    instance.moves_ahead = 3
+
+    # Nothing is read until the first lookup
+    assert opening.count == 0
+
+    score, col = opening.lookup(instance, '1')
+    assert opening.count == 5 and col == instance.determine_ai_move('1')
+
+    # determine_ai_move uses the book and boards after it are searched
+    instance.book = opening
+    instance.add_token(0, '1')
+    assert opening.lookup(instance, '2') is not None
+    assert instance.determine_ai_move('2') == 3
+
+    # The mirror image shares the record with the column mirrored
+    mirrored = game.Game()
+    mirrored.add_token(6, '1')
+    score, col = opening.lookup(instance, '2')
+    assert opening.lookup(mirrored, '2') == (score, 6 - col)
+    instance.add_token(3, '2')
+    assert opening.lookup(instance, '1') is None
+    assert instance.determine_ai_move('1') in range(instance.width)
+
+    # Books for other board sizes or lengths of line are ignored
+    assert opening.lookup(game.Game(8, 6), '1') is None
+    assert opening.lookup(game.Game(connect=5), '1') is None
+    opening.close()
+
+
+def test_invalid_book(tmp_path):
+    """Tests that files that are not books are rejected"""
+
+    path = tmp_path / 'invalid.book'
+    path.write_bytes(b'\0' * 64)
+
+    with pytest.raises(ValueError):
+        book.OpeningBook(str(path)).lookup(game.Game(), '1')
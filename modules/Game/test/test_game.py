@@ -3,6 +3,7 @@ import sys
 sys.path.insert(0, "..")
 
 import Game.game as game  # noqa: E402
+from Game.game import Game, SearchTimeout  # noqa: E402
 
 # Create a game instance that we will use for test
 game = game.Game()
@@ -153,5 +154,412 @@ def test_determine_ai_move():
     # Add a token to make sure there is only one possibility of winning/losing
     game.add_token(0, '2')
 
-    assert game.determine_ai_move('2') == 3
+    assert game.determine_ai_move('2') == 4
     assert game.determine_ai_move('1') == 4
+
+
+def test_bitboard_edges():
+    """Tests that lines are not detected across the edges of the board"""
+
+    # Three tokens at the top of column 0 and one at the bottom of column 1
+    # are next to each other in the bitboard but not on the board
+    game.reset_board()
+    for i in range(3):
+        game.add_token(0, '2')
+    for i in range(3):
+        game.add_token(0, '1')
+    game.add_token(1, '1')
+
+    assert not game.has_won('1')
+    assert game.board[0][0] == '1' and game.board[5][1] == '1'
+
+    # Removing tokens updates the bitboards and the board
+    assert game.remove_token(1) == 5
+    assert game.remove_token(1) == -1
+    assert game.board[5][1] == ' '
+
+
+def test_win_after_remove():
+    """Tests that removing a token from a 4-in-a-row clears the win"""
+
+    game.reset_board()
+    for i in range(4):
+        game.add_token(i, '1')
+    assert game.has_won('1') and not game.has_won('2')
+
+    # The game is no longer over once the line is broken
+    game.remove_token(2)
+    assert not game.has_won('1') and not game.is_game_over()
+
+    # Completing the line again from the middle is detected
+    game.add_token(2, '1')
+    assert game.is_game_over() and game.winner == '1'
+
+
+def test_search_root():
+    """Tests that search_root returns the score along with the column"""
+
+    game.reset_board()
+    for i in range(3):
+        game.add_token(i, '1')
+
+    # Player 1 wins right away and player 2 has to block
+    assert game.search_root('1', 2) == (999998, 3)
+    assert game.search_root('2', 2)[1] == 3
+
+    # The board is left unchanged by the search
+    assert game.board_score == 3 + 4 + 5
+    assert game.moves_made == [0, 1, 2]
+
+
+def test_time_limit():
+    """Tests the iterative deepening search with a time limit"""
+
+    game.reset_board()
+    game.add_token(3, '1')
+
+    # Searching for a short time goes deeper than one move
+    score, col, depth = game.iterative_deepening('2', 0.2)
+    assert game.allows_move(col) and depth > 1
+    assert game.determine_ai_move('2', time_limit=0.05) in range(game.width)
+
+    # A search that runs out of time leaves the board as it was
+    assert game.board == [[' '] * 7] * 5 + [[' ', ' ', ' ', '1', ' ', ' ',
+                                              ' ']]
+    assert game.board_score == 7 and game.deadline is None
+
+    # Wins are found without using the whole time limit
+    for i in range(2):
+        game.add_token(3, '1')
+    assert game.iterative_deepening('1', 10)[:2] == (999998, 3)
+
+
+def test_ordered_moves():
+    """Tests the dynamic move ordering used by both players"""
+
+    game.reset_board()
+    game.start_search()
+    game.history = [[0] * len(scores) for scores in game.history]
+
+    # Without any data the static order is used
+    assert game.ordered_moves('1', 0) == game.order
+    assert game.ordered_moves('2', 0) == game.order
+
+    # Transposition table move, then killers, then history
+    game.record_cutoff('2', 2, 6, 3)
+    game.record_cutoff('2', 2, 5, 1)
+    game.history[1][0] = 100
+    assert game.ordered_moves('2', 2, 1) == [1, 5, 6, 0, 3, 2, 4]
+
+    # Full columns are left out
+    for i in range(game.height):
+        game.add_token(3, '1')
+    assert 3 not in game.ordered_moves('1', 0)
+
+
+def test_search_drivers():
+    """Tests that every search driver finds the same score and column"""
+
+    game.reset_board()
+    for col in (3, 3, 2, 4, 4, 1):
+        game.add_token(col, game.curr_player)
+
+    results = []
+    for driver in ('alphabeta', 'pvs', 'mtdf'):
+        game.search_driver = driver
+        game.table.clear()
+        game.start_search()
+        results.append(game.search(game.curr_player, 5))
+
+    game.search_driver = 'alphabeta'
+    assert results[0] == results[1] == results[2]
+
+    # Unknown drivers are rejected
+    game.search_driver = 'minimax'
+    with pytest.raises(ValueError):
+        game.search(game.curr_player, 1)
+    game.search_driver = 'alphabeta'
+
+
+def test_solve():
+    """Tests the exact solver used near the end of the game"""
+
+    game.reset_board()
+    for col in [0, 6, 4, 0, 0, 0, 1, 1, 6, 0, 5, 2, 3, 6, 6, 1, 4, 0, 6, 6,
+                2, 2, 1, 4, 4, 2, 2, 4, 1, 4]:
+        game.add_token(col, game.curr_player)
+
+    # Player 1 wins with their 3rd token from now on
+    assert game.solve('1') == (5, 5, True)
+
+    # determine_ai_move switches to the solver with 12 empty positions
+    game.solver_threshold = 13
+    assert game.determine_ai_move('1') == 5 and game.proven
+
+    # Below the threshold the heuristic search is used
+    game.solver_threshold = 12
+    game.determine_ai_move('1')
+    assert not game.proven
+    game.solver_threshold = 20
+
+    # The solver reports when it did not finish in time
+    game.reset_board()
+    assert game.solve('1', 0.01) == (0, -1, False)
+    assert game.board_score == 0 and game.position.moves == 0
+
+
+def test_stop():
+    """Tests stopping a search and searching a copy of the game"""
+
+    game.reset_board()
+    game.add_token(3, '1')
+
+    # The copy has its own board but shares the transposition table
+    other = game.copy()
+    other.add_token(3, '2')
+    assert game.position.moves == 1 and other.position.moves == 2
+    assert other.table is game.table
+
+    # A stopped search without a time limit raises and restores the board
+    other.moves_ahead = 8
+    other.stop()
+    with pytest.raises(SearchTimeout):
+        other.determine_ai_move('1')
+    assert other.position.moves == 2 and other.board_score == 7 - 10
+
+    # A stopped timed search still returns a column
+    assert other.determine_ai_move('1', time_limit=10) in range(7)
+    assert not game.stop_requested
+
+
+def test_play_moves():
+    """Tests playing a sequence of moves from a string"""
+
+    game.reset_board()
+    game.play_moves('3342')
+    assert game.moves_made == [3, 3, 4, 2] and game.curr_player == '1'
+
+    game.play_moves('0, 6 6')
+    assert game.board[5][6] == '2' and game.board[4][6] == '1'
+
+    # Invalid columns stop at the first bad move
+    with pytest.raises(ValueError):
+        game.play_moves('1x')
+    assert game.board[5][1] == '2'
+    with pytest.raises(ValueError):
+        game.play_moves('7')
+
+
+def test_analyze():
+    """Tests scoring every column with a single search"""
+
+    game.reset_board()
+    game.play_moves('3342')
+    game.table.clear()
+    game.search_driver = 'alphabeta'
+
+    analysis = game.analyze('1', 4)
+    assert analysis['depth'] == 4
+    assert analysis['score'] == game.search('1', 4)[0]
+    assert analysis['bounds'][analysis['best']] == 'exact'
+    assert len(analysis['pv']) == 4 and analysis['pv'][0] == analysis['best']
+    assert game.position.moves == 4
+
+    # Each score is the exact score of its column or a bound on it
+    for col in range(7):
+        game.add_token(col, '1', True)
+        score = game.alpha_beta_pruning(col, 3, -999999, 999999,
+                                        game.board_score, '2', 1)[0]
+        game.remove_token(col)
+
+        bound = analysis['bounds'][col]
+        if bound == 'exact':
+            assert analysis['scores'][col] == score
+        elif bound == 'upper':
+            assert analysis['scores'][col] >= score
+        else:
+            assert analysis['scores'][col] <= score
+
+    # A full column has no score
+    game.reset_board()
+    game.play_moves('000000')
+    analysis = game.analyze('1', 2)
+    assert analysis['scores'][0] is None and analysis['bounds'][0] is None
+
+
+def test_set_evaluation():
+    """Tests changing the evaluation of the bot"""
+
+    game.reset_board()
+    game.play_moves('33')
+    assert game.board_score == 7 - 10
+
+    game.set_evaluation('flat')
+    assert game.board_score == 0 and game.evaluation == 'flat'
+
+    game.set_evaluation('positional')
+    assert game.board_score == 7 - 10
+
+    with pytest.raises(ValueError):
+        game.set_evaluation('random')
+
+
+def test_variants():
+    """Tests boards of other sizes and lengths of winning line"""
+
+    # The computed table of the standard board
+    assert game.setup_values() == [[3, 4, 5, 7, 5, 4, 3],
+                                   [4, 6, 8, 10, 8, 6, 4],
+                                   [5, 8, 11, 13, 11, 8, 5],
+                                   [5, 8, 11, 13, 11, 8, 5],
+                                   [4, 6, 8, 10, 8, 6, 4],
+                                   [3, 4, 5, 7, 5, 4, 3]]
+
+    variant = Game(8, 7, connect=5)
+    assert variant.order == [3, 4, 2, 5, 1, 6, 0, 7]
+    assert variant.position_values[3][3] == 13
+    assert variant.position_values[0][0] == 3
+
+    # Four in a row does not win, five does
+    variant.play_moves('0011223')
+    assert variant.position.moves == 7 and not variant.is_game_over()
+    variant.play_moves('34')
+    assert variant.is_game_over() and variant.winner == '1'
+    assert variant.check_winner(6, 0, '1')
+    assert not variant.check_winner(6, 1, '1')
+
+    # Removing a token of the line clears the win
+    variant.remove_token(4)
+    assert not variant.has_won('1')
+
+    # The bot blocks the fifth token of a line
+    variant.reset_board()
+    variant.play_moves('0617273')
+    variant.moves_ahead = 3
+    assert variant.determine_ai_move('2') == 4
+
+    # Connect 3 on a small board
+    small = Game(4, 4, connect=3)
+    assert small.order == [1, 2, 0, 3]
+    small.play_moves('01020')
+    assert small.is_game_over() and small.winner == '1'
+
+
+def test_threats_evaluation():
+    """Tests the incremental threat evaluation"""
+
+    game.set_evaluation('threats')
+    game.reset_board()
+
+    # The token is the only one in each of the 7 lines through it
+    game.play_moves('3')
+    counter = game.position.threats
+    assert counter.score == 7 and game.board_score == 7 + 7
+
+    # The score after moves and removals is the same as rebuilding it
+    game.play_moves('344221')
+    game.remove_token(1)
+    game.remove_token(2)
+    rebuilt = Game()
+    rebuilt.set_evaluation('threats')
+    rebuilt.load_board(game.board)
+    assert rebuilt.board_score == game.board_score
+    assert rebuilt.position.threats.counts == counter.counts
+
+    # Copies have their own counts
+    other = game.copy()
+    other.add_token(5, '2')
+    assert other.position.threats.score != counter.score
+
+    game.set_evaluation('positional')
+    assert game.position.threats is None
+
+
+def test_tactical_moves():
+    """Tests the immediate wins and forced blocks found before searching"""
+
+    moves = list(range(7))
+
+    # Player '1' wins on top of column 0
+    game.reset_board()
+    game.play_moves('010101')
+    assert game.tactical_moves('1', moves, 2) == (0, [0])
+    assert game.tactical_moves('1', moves, 1) == (-1, moves)
+
+    # Player '2' has to block it
+    game.reset_board()
+    game.play_moves('01010')
+    assert game.tactical_moves('2', moves, 2) == (-1, [0])
+
+    # Player '1' wins on the second row of column 3, so '2' avoids it
+    game.reset_board()
+    game.play_moves('2001162')
+    winning = game.position.winning_positions(0)
+    assert winning == 1 << (3 * game.position.stride + 1)
+    assert game.tactical_moves('2', moves, 2) == (-1, [0, 1, 2, 4, 5, 6])
+    assert game.tactical_moves('2', [3], 2) == (-1, [3])
+
+
+def test_mirror_keys():
+    """Tests that a board and its mirror image share their table entries"""
+
+    game.reset_board()
+    game.play_moves('0112')
+    key = game.table_key('1')
+    mirrored = Game()
+    mirrored.play_moves('6554')
+    assert mirrored.table_key('1') == key
+    assert mirrored.position.is_mirrored() != game.position.is_mirrored()
+
+    # A column saved from one board is read back mirrored on the other
+    game.start_search()
+    game.store_result(key, 3, 10, 1, -999999, 999999)
+    mirrored.table = game.table
+    assert mirrored.probe_table(key, 3, -999999, 999999)[:2] == (10, 5)
+
+    # Symmetric boards keep their columns
+    game.reset_board()
+    game.play_moves('3')
+    assert not game.position.is_mirrored() and game.table_column(2) == 2
+
+
+def test_snapshot():
+    """Tests saving and restoring the state of the game"""
+
+    game.set_evaluation('threats')
+    game.reset_board()
+    game.play_moves('3342')
+    state = game.snapshot()
+    board = game.board
+    key = game.table_key('1')
+    score = game.board_score
+    counts = [line_counts[:] for line_counts in game.position.threats.counts]
+
+    # Moves played after the snapshot are taken back by restore
+    game.play_moves('00000')
+    assert game.remove_previous_move() == (1, 0)
+    game.restore(state)
+    assert game.board == board and game.board_score == score
+    assert game.moves_made == [3, 3, 4, 2] and game.curr_player == '1'
+    assert game.table_key('1') == key and game.position.heights[0] == 0
+    assert game.position.threats.counts == counts
+
+    # The snapshot is not changed by the game and can be restored again
+    game.play_moves('5')
+    game.restore(state)
+    assert game.moves_made == [3, 3, 4, 2] and game.board == board
+
+    # The winner follows the moves that are made and taken back
+    game.play_moves('506')
+    assert game.winner == '1'
+    game.remove_previous_move()
+    assert game.winner == '-1' and game.curr_player == '1'
+    game.restore(state)
+
+    # A snapshot of another evaluation gets its score recomputed
+    game.set_evaluation('positional')
+    game.restore(state)
+    fresh = Game()
+    fresh.play_moves('3342')
+    assert game.board_score == fresh.board_score
+    assert game.position.threats is None
@@ -0,0 +1,68 @@
+import pytest
+import sys
+sys.path.insert(0, "..")
+
+import Game.game as game  # noqa: E402
+import Game.parallel as parallel  # noqa: E402
+
+
+def test_parallel_search():
+    """Tests that the parallel search agrees with the single process one"""
+
+    search = parallel.ParallelSearch(2)
+    instance = game.Game()
+
+    try:
+        # The last board loses whatever is played
+        for moves in ([], [3, 3, 2], [0, 1, 2, 3, 4, 5, 6, 6],
+                      [2, 1, 3, 3, 3, 3, 3, 3, 2, 2, 5, 4, 2, 4, 1, 4]):
+            instance.reset_board()
+            for col in moves:
+                instance.add_token(col, instance.curr_player)
+
+            player = instance.curr_player
+            instance.start_search()
+            expected = instance.search(player, 5)
+            assert search.search(instance, player, 5) == expected
+
+            # determine_ai_move uses the pool once it is set
+            instance.parallel = search
+            instance.moves_ahead = 5
+            assert instance.determine_ai_move(player) == expected[1]
+            instance.parallel = None
+
+        # The board is not changed
+        assert instance.position.moves == 16
+
+        # Player 2 wins right away
+        instance.reset_board()
+        instance.play_moves('0101615')
+        assert search.search(instance, '2', 3) == (-999998, 1)
+        assert instance.search('2', 3) == (-999998, 1)
+    finally:
+        search.close()
+
+
+def test_parallel_search_repeats():
+    """Tests that a warm pool finds the same results as a cold one"""
+
+    search = parallel.ParallelSearch(4)
+    instance = game.Game()
+    moves = '3342250161'
+
+    def search_all(order):
+        results = {}
+        for length in order:
+            instance.reset_board()
+            instance.play_moves(moves[:length])
+            results[length] = search.search(instance, instance.curr_player,
+                                            5)
+        return results
+
+    try:
+        # Whatever the workers searched before does not change the results
+        first = search_all(range(2, len(moves)))
+        assert search_all(range(2, len(moves))) == first
+        assert search_all(reversed(range(2, len(moves)))) == first
+    finally:
+        search.close()
@@ -0,0 +1,83 @@
+import io
+import pytest
+import sys
+import time
+sys.path.insert(0, "..")
+
+import Game.protocol as protocol  # noqa: E402
+
+
+def run(commands):
+    """Runs the commands through a new engine and returns its answers"""
+
+    output = io.StringIO()
+    protocol.EngineProtocol(output=output).run(commands)
+    return output.getvalue().splitlines()
+
+
+def test_go():
+    """Tests the position, go and eval commands"""
+
+    answers = run(['position 3342', 'eval', 'go depth 3', 'position 303030',
+                   'go movetime 200', 'quit'])
+
+    assert answers[0] == 'eval -3'
+    assert answers[1].startswith('info depth 3 score')
+    assert answers[2].startswith('bestmove ')
+
+    # Player 1 wins right away
+    assert answers[3].startswith('info depth 1 score 999998')
+    assert answers[4] == 'bestmove 3'
+
+
+def test_stop():
+    """Tests that a search without limits answers once it is stopped"""
+
+    answers = run(['position', 'go', 'stop', 'isready', 'quit'])
+
+    # readyok does not wait for the search
+    answers.remove('readyok')
+    assert answers[0].startswith('info depth')
+    assert answers[1].startswith('bestmove')
+
+    # A stop also reaches the searches that did not start yet
+    answers = run(['position', 'go', 'go', 'stop', 'quit'])
+    assert len(answers) == 4 and answers[3].startswith('bestmove')
+
+
+def test_read_while_searching():
+    """Tests that commands are still read while a search is running"""
+
+    output = io.StringIO()
+    engine = protocol.EngineProtocol(output=output)
+
+    def commands():
+        yield 'position'
+        yield 'go'
+        yield 'isready'
+
+        # readyok comes while the search is still running
+        deadline = time.monotonic() + 10
+        while 'readyok' not in output.getvalue():
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert 'bestmove' not in output.getvalue()
+
+        yield 'stop'
+
+    engine.run(commands())
+    answers = output.getvalue().splitlines()
+    assert answers[0] == 'readyok' and answers[2].startswith('bestmove')
+
+
+def test_errors():
+    """Tests that invalid commands are answered with errors"""
+
+    answers = run(['jump', 'position 7', 'go depth', 'position 3030303',
+                   'go', 'newgame', 'go depth 1'])
+
+    assert answers[0] == 'error unknown command jump'
+    assert answers[1] == 'error Cannot play in column 7'
+    assert answers[2].startswith('error expected go')
+    assert answers[3] == 'error the game is over'
+    assert answers[5] == 'bestmove 3'
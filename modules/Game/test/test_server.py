@@ -0,0 +1,150 @@
+import asyncio
+import json
+import pytest
+import sys
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, "..")
+
+import Game.server as server  # noqa: E402
+
+
+async def send(reader, writer, message):
+    """Sends a message to the server and returns its decoded answer"""
+
+    writer.write(json.dumps(message).encode() + b'\n')
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def play_game(port, bot):
+    """Plays a game with the lowest open column against the bot"""
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    state = await send(reader, writer, {'op': 'new', 'bot': bot})
+
+    while state['winner'] == '-1':
+        column = min(set(range(7)) - {c for c in state['moves']
+                                      if state['moves'].count(c) == 6})
+        state = await send(reader, writer, {'op': 'move',
+                                            'session': state['session'],
+                                            'column': column})
+        assert 'error' not in state
+
+    closed = await send(reader, writer, {'op': 'close',
+                                         'session': state['session']})
+    writer.close()
+    return state, closed
+
+
+def test_concurrent_games():
+    """Tests several games played against the bot at the same time"""
+
+    async def run():
+        match_server = server.MatchServer(move_time=0.05, budget=0.3,
+                                          executor=ThreadPoolExecutor(4))
+        port = await match_server.start()
+
+        results = await asyncio.gather(*[play_game(port, bot)
+                                         for bot in ('1', '2', '2')])
+        await match_server.close()
+        return match_server, results
+
+    match_server, results = asyncio.run(run())
+
+    for state, closed in results:
+        # The bot wins against a player that always plays the same column
+        assert state['winner'] == state['bot']
+        assert 0 <= state['budget'] < 0.3
+        assert closed['closed']
+
+    assert match_server.sessions == {}
+
+
+def test_errors():
+    """Tests that invalid messages are answered with errors"""
+
+    async def run():
+        match_server = server.MatchServer(executor=ThreadPoolExecutor(1),
+                                          max_sessions=1)
+        port = await match_server.start()
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+
+        answers = [await send(reader, writer, {'op': 'new', 'bot': '1'}),
+                   await send(reader, writer, {'op': 'new'}),
+                   await send(reader, writer, {'op': 'move', 'session': 1,
+                                               'column': 9}),
+                   await send(reader, writer, {'op': 'move', 'session': 5,
+                                               'column': 0}),
+                   await send(reader, writer, {'op': 'jump', 'session': 1})]
+
+        writer.write(b'not json\n')
+        answers.append(json.loads(await reader.readline()))
+
+        writer.close()
+        await match_server.close()
+        return answers
+
+    answers = asyncio.run(run())
+
+    assert answers[0]['bot_move'] in range(7) and answers[0]['moves']
+    assert all('error' in answer for answer in answers[1:])
+
+
+def test_disconnect():
+    """Tests that the games of a client end when it disconnects"""
+
+    async def run():
+        match_server = server.MatchServer(executor=ThreadPoolExecutor(1),
+                                          max_sessions=1)
+        port = await match_server.start()
+
+        # The only session is freed by the disconnect, not by a close
+        for attempt in range(2):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            answer = await send(reader, writer, {'op': 'new'})
+            assert 'error' not in answer and len(match_server.sessions) == 1
+            writer.close()
+            await writer.wait_closed()
+
+            for wait in range(100):
+                if not match_server.sessions:
+                    break
+                await asyncio.sleep(0.01)
+            assert match_server.sessions == {}
+
+        await match_server.close()
+
+    asyncio.run(run())
+
+
+def test_other_client_session():
+    """Tests that a client cannot use the games of another client"""
+
+    async def run():
+        match_server = server.MatchServer(executor=ThreadPoolExecutor(1))
+        port = await match_server.start()
+
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        other_reader, other_writer = await asyncio.open_connection(
+            '127.0.0.1', port)
+
+        session = (await send(reader, writer, {'op': 'new'}))['session']
+        answers = [await send(other_reader, other_writer,
+                              {'op': 'move', 'session': session,
+                               'column': 3}),
+                   await send(other_reader, other_writer,
+                              {'op': 'state', 'session': session}),
+                   await send(other_reader, other_writer,
+                              {'op': 'close', 'session': session})]
+        state = await send(reader, writer, {'op': 'state',
+                                            'session': session})
+
+        writer.close()
+        other_writer.close()
+        await match_server.close()
+        return answers, state
+
+    answers, state = asyncio.run(run())
+
+    assert all('error' in answer for answer in answers)
+    assert state['moves'] == [] and state['winner'] == '-1'
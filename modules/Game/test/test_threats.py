@@ -0,0 +1,56 @@
+import pytest
+import sys
+sys.path.insert(0, "..")
+
+import Game.threats as threats  # noqa: E402
+
+
+def test_line_tables():
+    """Tests the lines of the standard board"""
+
+    masks, cell_lines = threats.line_tables(7, 6, 4)
+
+    # 24 horizontal, 21 vertical and 12 in each diagonal direction
+    assert len(masks) == 69
+    assert all(bin(mask).count('1') == 4 for mask in masks)
+
+    # The bottom left corner is in one line of each direction but the
+    # down-right diagonal
+    assert len(cell_lines[0]) == 3
+    assert threats.line_tables(7, 6, 4) is threats.line_tables(7, 6, 4)
+
+
+def test_threat_parity():
+    """Tests that threats are worth more on the parity of their player"""
+
+    counter = threats.ThreatCounter()
+
+    # The bottom row from column 0 to 3, with column 3 missing
+    line = counter.masks.index(1 | 1 << 7 | 1 << 14 | 1 << 21)
+    mask = 1 | 1 << 7 | 1 << 14
+
+    # The bottom row is odd, which is good for player '1' only
+    assert counter.line_value(line, 3, 0, mask) == 64
+    assert counter.line_value(line, 3, 1, mask) == 32
+    assert counter.line_value(line, 2, 0, mask) == 4
+
+
+def test_play_and_remove():
+    """Tests that lines blocked by the opponent lose their value"""
+
+    counter = threats.ThreatCounter()
+
+    # Three tokens of player '1' on the bottom row, columns 1 to 3
+    mask = 0
+    for col in (1, 2, 3):
+        counter.play(col * 7, 0, mask)
+        mask |= 1 << col * 7
+    score = counter.score
+    assert score > 2 * 64
+
+    # Player '2' blocks column 4, only the threat on column 0 is left
+    counter.play(4 * 7, 1, mask)
+    assert counter.score < score - 64
+
+    counter.remove(4 * 7, 1, mask | 1 << 4 * 7)
+    assert counter.score == score
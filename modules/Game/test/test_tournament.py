@@ -0,0 +1,65 @@
+import json
+import math
+import pytest
+import random
+import sys
+sys.path.insert(0, "..")
+
+import Game.tournament as tournament  # noqa: E402
+
+
+def test_parse_engine():
+    """Tests reading engine configurations"""
+
+    assert tournament.parse_engine('depth=2,eval=flat,name=weak') == {
+        'name': 'weak', 'depth': 2, 'time': None, 'eval': 'flat'}
+    assert tournament.parse_engine('time=0.5')['time'] == 0.5
+
+    for text in ('depth=x', 'eval=random', 'speed=2'):
+        with pytest.raises(ValueError):
+            tournament.parse_engine(text)
+
+    # Names must be different
+    with pytest.raises(ValueError):
+        tournament.parse_engine('depth=4,name=weak', ['weak'])
+
+
+def test_elo():
+    """Tests the Elo estimates"""
+
+    assert tournament.elo_difference(0.5) == 0
+    assert round(tournament.elo_difference(0.75)) == 191
+    assert tournament.elo_difference(1) == math.inf
+
+    pairings = [{'first': 'a', 'second': 'b',
+                 'wins': 3, 'draws': 0, 'losses': 1}]
+    ratings = tournament.elo_ratings(['a', 'b'], pairings)
+    assert ratings['a'] > 0 and ratings['a'] == -ratings['b']
+
+
+def test_run_tournament(tmp_path):
+    """Tests a small tournament"""
+
+    opening = tournament.random_opening(random.Random(1), 4)
+    assert len(opening) == 4
+
+    engines = [tournament.parse_engine('depth=1,name=weak'),
+               tournament.parse_engine('depth=4,name=strong')]
+    report = tournament.run_tournament(engines, games=4, workers=2)
+
+    assert report['games'] == 4 and report['games_per_second'] > 0
+    result = report['pairings'][0]
+    assert (result['first'], result['second']) == ('weak', 'strong')
+    assert result['wins'] + result['draws'] + result['losses'] == 4
+    assert result['losses'] > result['wins']
+    assert report['ratings']['strong'] > report['ratings']['weak']
+
+    # Engines with the same name and empty pairings are refused
+    with pytest.raises(ValueError):
+        tournament.run_tournament([engines[0], dict(engines[1], name='weak')])
+    with pytest.raises(ValueError):
+        tournament.run_tournament(engines, games=0)
+
+    path = tmp_path / 'report.json'
+    tournament.write_report(report, str(path))
+    assert json.loads(path.read_text())['games'] == 4
@@ -0,0 +1,54 @@
+import pytest
+import sys
+sys.path.insert(0, "..")
+
+import Game.game as game  # noqa: E402
+import Game.transposition as transposition  # noqa: E402
+
+
+def test_hash_transpositions():
+    """Tests that the same position reached in two orders has the same hash"""
+
+    first = game.Game()
+    for col in (3, 2, 4):
+        first.add_token(col, first.curr_player)
+
+    second = game.Game()
+    for col in (4, 2, 3):
+        second.add_token(col, second.curr_player)
+
+    assert first.position.hash == second.position.hash
+
+    # Removing the tokens brings the hash back to the empty board
+    for col in (3, 2, 4):
+        first.remove_token(col)
+    assert first.position.hash == 0
+    assert first.board_score == 0
+
+
+def test_replacement_policy():
+    """Tests the two-tier buckets and the counters of the table"""
+
+    # A table with a single bucket
+    table = transposition.TranspositionTable(0)
+    assert table.size == 1
+
+    table.store(1, 5, 10, transposition.EXACT, 3)
+    assert table.probe(1) == (1, 5, 10, transposition.EXACT, 3)
+    assert table.probe(2) is None
+    assert table.hits == 1 and table.misses == 1
+
+    # A shallower search goes to the always-replace slot
+    table.store(2, 2, 20, transposition.LOWER, 4)
+    assert table.probe(1)[1] == 5 and table.probe(2)[1] == 2
+    assert table.overwrites == 0
+
+    # Another shallow search replaces it but not the deep entry
+    table.store(3, 1, 30, transposition.UPPER, 0)
+    assert table.probe(2) is None and table.probe(1) is not None
+    assert table.overwrites == 1
+
+    # A deeper search takes the depth-preferred slot
+    table.store(4, 6, 40, transposition.EXACT, 1)
+    assert table.probe(1) is None and table.probe(4)[2] == 40
+    assert table.overwrites == 2
@@ -0,0 +1,263 @@
+# The lines of each size of board, keyed by (width, height, connect)
+# so that every position of the same variant shares them
+LINE_TABLES = {}
+
+# Value of a line that only holds tokens of one player, by the number of
+# tokens in it. A line with one token less than a win is a threat, which is
+# worth more when it is on the row parity of its player: odd rows (counted
+# from 1 at the bottom) for player '1' and even rows for player '2'
+THREAT_VALUE = 32
+PARITY_BONUS = 32
+
+
+def line_tables(width, height, connect):
+    """Computes every line of connect positions that fits in the board
+
+    Parameters
+    ----------
+    width : int
+        Number of columns of the board
+    height : int
+        Number of rows of the board
+    connect : int
+        The number of tokens in a line that wins the game
+
+    Returns
+    -------
+    tuple of list of int and list of list of int
+        A tuple containing (masks, cell_lines): the bitboard of each line,
+        and for each bit of the bitboard the lines that go through it
+    """
+
+    variant = (width, height, connect)
+    if variant in LINE_TABLES:
+        return LINE_TABLES[variant]
+
+    stride = height + 1
+    masks = []
+    cell_lines = [[] for bit in range(width * stride)]
+
+    # Start a line from every position in every direction, rows are counted
+    # from the bottom like the bits of a column
+    for col_step, row_step in ((1, 0), (0, 1), (1, 1), (1, -1)):
+        for col in range(width):
+            for row in range(height):
+                last_col = col + col_step * (connect - 1)
+                last_row = row + row_step * (connect - 1)
+                if not (0 <= last_col < width and 0 <= last_row < height):
+                    continue
+
+                mask = 0
+                for i in range(connect):
+                    bit = (col + col_step * i) * stride + row + row_step * i
+                    mask |= 1 << bit
+                    cell_lines[bit].append(len(masks))
+                masks.append(mask)
+
+    LINE_TABLES[variant] = (masks, cell_lines)
+    return masks, cell_lines
+
+
+class ThreatCounter:
+    """This class scores a board by the open lines of each player.
+
+    The number of tokens of each player is counted in every line that could
+    still become a win. A line with tokens of both players can never be
+    completed and is worth nothing. Otherwise it is worth 4 times more for
+    each token in it, and a threat (a line that is one token from a win) is
+    worth THREAT_VALUE, plus PARITY_BONUS if the missing position is on the
+    row parity of its player, since those threats are the ones that decide
+    the game once the board fills up.
+
+    The counts and the score are updated by play and remove with only the
+    lines through the position that changed, so the evaluation costs the
+    same no matter how full the board is.
+
+    Attributes
+    ----------
+    connect : int
+        The number of tokens in a line that wins the game
+    stride : int
+        The number of bits used by a single column of the bitboards
+    masks : list of int
+        The bitboard of each line
+    cell_lines : list of list of int
+        The lines that go through each bit of the bitboard
+    weights : list of int
+        The value of a line by its number of tokens
+    counts : list of list of int
+        The number of tokens of each player in each line
+    score : int
+        The value of the lines of player '1' minus the value of the lines
+        of player '2'
+    """
+
+    def __init__(self, width=7, height=6, connect=4):
+        """Constructor for a ThreatCounter object
+
+        Parameters
+        ----------
+        width : int
+            Number of columns of the board
+        height : int
+            Number of rows of the board
+        connect : int
+            The number of tokens in a line that wins the game
+        """
+
+        self.connect = connect
+        self.stride = height + 1
+        self.masks, self.cell_lines = line_tables(width, height, connect)
+
+        # A complete line is a win, which the search scores by itself
+        self.weights = [0] + [4 ** (count - 1) for count in range(1, connect)]
+        self.weights[connect - 1] = THREAT_VALUE
+        self.weights.append(0)
+
+        self.reset()
+
+    def reset(self):
+        """Removes every token from the counts"""
+
+        self.counts = [[0] * len(self.masks) for player in range(2)]
+        self.score = 0
+
+    def copy(self):
+        """Creates an independent copy of the counts
+
+        Returns
+        -------
+        ThreatCounter
+            A counter with the same counts and score
+        """
+
+        other = ThreatCounter.__new__(ThreatCounter)
+        other.__dict__.update(self.__dict__)
+        other.counts = [counts[:] for counts in self.counts]
+
+        return other
+
+    def snapshot(self):
+        """Saves the counts so that they can be restored later
+
+        Returns
+        -------
+        tuple
+            The counts of each player and the score, as tuples that are
+            never changed
+        """
+
+        return tuple(self.counts[0]), tuple(self.counts[1]), self.score
+
+    def restore(self, state):
+        """Puts back the counts saved by snapshot
+
+        Parameters
+        ----------
+        state : tuple
+            A tuple returned by snapshot of a counter for the same board
+        """
+
+        self.counts = [list(state[0]), list(state[1])]
+        self.score = state[2]
+
+    def line_value(self, line, count, player, mask):
+        """Computes the value of a line that only holds tokens of player
+
+        Parameters
+        ----------
+        line : int
+            The index of the line
+        count : int
+            The number of tokens of player in the line
+        player : int
+            The index of the player, 0 for '1' and 1 for '2'
+        mask : int
+            A bitboard of every occupied position
+
+        Returns
+        -------
+        int
+            The value of the line for player
+        """
+
+        value = self.weights[count]
+
+        # Find the row of the missing position of a threat
+        if count == self.connect - 1:
+            missing = self.masks[line] & ~mask
+            row = (missing.bit_length() - 1) % self.stride
+            if row % 2 == player:
+                value += PARITY_BONUS
+
+        return value
+
+    def play(self, index, player, mask):
+        """Counts a token that is added to the board
+
+        Parameters
+        ----------
+        index : int
+            The bit of the position of the token
+        player : int
+            The index of the player, 0 for '1' and 1 for '2'
+        mask : int
+            A bitboard of every occupied position, without the token
+        """
+
+        counts = self.counts[player]
+        others = self.counts[1 - player]
+        added = mask | (1 << index)
+        change = 0
+
+        for line in self.cell_lines[index]:
+            count = counts[line]
+            counts[line] = count + 1
+
+            # The token blocks a line of the opponent, which loses its value
+            other = others[line]
+            if other:
+                if not count:
+                    change += self.line_value(line, other, 1 - player, mask)
+                continue
+
+            change -= self.line_value(line, count, player, mask)
+            change += self.line_value(line, count + 1, player, added)
+
+        # The score is seen from player '1'
+        self.score += -change if player else change
+
+    def remove(self, index, player, mask):
+        """Uncounts a token that is removed from the board
+
+        Parameters
+        ----------
+        index : int
+            The bit of the position of the token
+        player : int
+            The index of the player, 0 for '1' and 1 for '2'
+        mask : int
+            A bitboard of every occupied position, with the token
+        """
+
+        counts = self.counts[player]
+        others = self.counts[1 - player]
+        removed = mask & ~(1 << index)
+        change = 0
+
+        for line in self.cell_lines[index]:
+            count = counts[line] - 1
+            counts[line] = count
+
+            # The line of the opponent is open again
+            other = others[line]
+            if other:
+                if not count:
+                    change -= self.line_value(line, other, 1 - player,
+                                              removed)
+                continue
+
+            change -= self.line_value(line, count + 1, player, mask)
+            change += self.line_value(line, count, player, removed)
+
+        self.score += -change if player else change
@@ -0,0 +1,404 @@
+import itertools
+import json
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .game import Game, EVALUATIONS, PLAYER_INDEX
+
+# The games of each worker process, one per engine name and variant, kept
+# between games so that their transposition tables are reused
+_worker_games = {}
+
+
+def parse_engine(text, names=()):
+    """Reads the configuration of an engine from the command line
+
+    Parameters
+    ----------
+    text : str
+        Comma-separated settings, for example 'depth=4,time=0.1,eval=flat'
+            depth - the number of moves to look ahead (default 4), or the
+                    deepest search when there is a time limit
+            time - the number of seconds each move may take
+            eval - the evaluation, one of EVALUATIONS (default positional)
+            name - the name in the reports (default: the settings)
+    names : collection of str
+        The names of the engines read before, which this one may not use
+
+    Returns
+    -------
+    dict
+        The configuration with the keys name, depth, time and eval
+
+    Raises
+    ------
+    ValueError
+        If a setting is unknown or its value is invalid, or the name is
+        already used
+    """
+
+    engine = {'name': text, 'depth': 4, 'time': None, 'eval': 'positional'}
+
+    for setting in text.split(','):
+        key, _, value = setting.partition('=')
+        if key == 'depth':
+            engine['depth'] = int(value)
+        elif key == 'time':
+            engine['time'] = float(value)
+        elif key == 'eval' and value in EVALUATIONS:
+            engine['eval'] = value
+        elif key == 'name' and value:
+            engine['name'] = value
+        else:
+            raise ValueError('Invalid engine setting: ' + setting)
+
+    # Results and the games of the workers are kept by name
+    if engine['name'] in names:
+        raise ValueError('Duplicate engine name: ' + engine['name'])
+
+    return engine
+
+
+def random_opening(rng, plies, width=7, height=6, connect=4):
+    """Picks random moves to start a game from
+
+    Parameters
+    ----------
+    rng : random.Random
+        The random number generator to pick the moves with
+    plies : int
+        The number of moves to play
+    width : int
+        Number of columns of the board
+    height : int
+        Number of rows of the board
+    connect : int
+        The number of tokens in a line that wins the game
+
+    Returns
+    -------
+    list of int
+        The columns of the moves, none of them ends the game
+    """
+
+    game = Game(width, height, table_mb=0, connect=connect)
+    moves = []
+
+    while len(moves) < plies:
+        player = game.curr_player
+        index = PLAYER_INDEX[player]
+        columns = [col for col in range(width) if game.allows_move(col)
+                   and not game.position.is_winning_move(col, index)]
+        if not columns:
+            break
+
+        col = rng.choice(columns)
+        game.add_token(col, player)
+        moves.append(col)
+
+    return moves
+
+
+def _engine_game(engine, variant):
+    """Finds the game of an engine in a worker process
+
+    Parameters
+    ----------
+    engine : dict
+        The configuration returned by parse_engine
+    variant : tuple of int
+        The (width, height, connect) of the game
+
+    Returns
+    -------
+    Game
+        The game of the engine, with an empty board
+    """
+
+    key = (engine['name'], variant)
+    game = _worker_games.get(key)
+    if game is None:
+        width, height, connect = variant
+        game = _worker_games[key] = Game(width, height, connect=connect)
+        game.set_evaluation(engine['eval'])
+        game.moves_ahead = engine['depth']
+
+    game.reset_board()
+    return game
+
+
+def play_game(first, second, opening, variant=(7, 6, 4)):
+    """Plays one game between two engines in a worker process
+
+    Parameters
+    ----------
+    first : dict
+        The configuration of the engine that plays '1'
+    second : dict
+        The configuration of the engine that plays '2'
+    opening : list of int
+        The columns played before the engines take over
+    variant : tuple of int
+        The (width, height, connect) of the game
+
+    Returns
+    -------
+    str
+        The winner, '1', '2' or 'Draw!'
+    """
+
+    games = {'1': _engine_game(first, variant),
+             '2': _engine_game(second, variant)}
+    engines = {'1': first, '2': second}
+
+    # Each engine keeps its own board, so every move is played on both
+    moves = iter(opening)
+    referee = games['1']
+    while not referee.is_game_over():
+        player = referee.curr_player
+        col = next(moves, None)
+
+        if col is None:
+            engine = engines[player]
+            if engine['time'] is None:
+                col = games[player].determine_ai_move(player)
+            else:
+                col = games[player].determine_ai_move(player, engine['time'],
+                                                      engine['depth'])
+
+        for game in set(games.values()):
+            game.add_token(col, player)
+
+    return referee.winner
+
+
+def elo_difference(score):
+    """Computes the Elo difference that makes a score expected
+
+    Parameters
+    ----------
+    score : float
+        The fraction of the points that were won, between 0 and 1
+
+    Returns
+    -------
+    float
+        The Elo of the player minus the Elo of their opponent, infinite if
+        the score is 0 or 1
+    """
+
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+
+    return -400 * math.log10(1 / score - 1)
+
+
+def elo_ratings(names, pairings, iterations=200):
+    """Fits the Elo ratings of every engine to the results of all pairings
+
+    A perfect score would need an infinite rating, so every engine is
+    counted as if it had also drawn one game against each opponent.
+
+    Parameters
+    ----------
+    names : list of str
+        The names of the engines
+    pairings : list of dict
+        The results of each pairing, as returned by run_tournament
+    iterations : int
+        The number of times the ratings are updated
+
+    Returns
+    -------
+    dict of str and float
+        The rating of each engine, their average is 0
+    """
+
+    ratings = dict.fromkeys(names, 0.0)
+
+    for iteration in range(iterations):
+        for name in names:
+            points = 0.0
+            expected = 0.0
+            games = 0
+            for pairing in pairings:
+                if name not in (pairing['first'], pairing['second']):
+                    continue
+
+                count = pairing['wins'] + pairing['draws'] + pairing['losses']
+                if name == pairing['first']:
+                    opponent = pairing['second']
+                    won = pairing['wins']
+                else:
+                    opponent = pairing['first']
+                    won = pairing['losses']
+
+                points += won + pairing['draws'] / 2 + 0.5
+                games += count + 1
+                expected += (count + 1) / (1 + 10 ** ((ratings[opponent] -
+                                                       ratings[name]) / 400))
+
+            if games:
+                ratings[name] += 400 * (points - expected) / games
+
+        # Only the differences matter, keep the ratings around 0
+        average = sum(ratings.values()) / len(ratings)
+        for name in names:
+            ratings[name] -= average
+
+    return {name: round(rating, 1) for name, rating in ratings.items()}
+
+
+def run_tournament(engines, games=10, plies=2, workers=None, seed=0,
+                   variant=(7, 6, 4)):
+    """Plays every pair of engines against each other
+
+    The games of a pairing are played in pairs from the same random opening,
+    once with each engine going first.
+
+    Parameters
+    ----------
+    engines : list of dict
+        The configurations returned by parse_engine, with different names
+    games : int
+        The number of games played by each pairing, rounded up to an even
+        number, at least 1
+    plies : int
+        The number of random moves each opening starts with
+    workers : int or None
+        The number of worker processes, None for one per CPU
+    seed : int
+        The seed of the random openings, the same seed plays the same
+        openings
+    variant : tuple of int
+        The (width, height, connect) of the games
+
+    Returns
+    -------
+    dict
+        The report of the tournament:
+            "pairings" - the wins, draws and losses of the first engine of
+                         each pairing against the second, and its Elo
+                         difference
+            "ratings" - the Elo rating of each engine, fitted to all games
+            "games", "seconds" - the number of games and how long they took
+            "games_per_second" - the speed of the tournament
+
+    Raises
+    ------
+    ValueError
+        If two engines have the same name or games is less than 1
+    """
+
+    names = [engine['name'] for engine in engines]
+    if len(set(names)) != len(names):
+        raise ValueError('Every engine needs a different name')
+    if games < 1:
+        raise ValueError('Each pairing needs at least one game')
+
+    rng = random.Random(seed)
+    schedule = []
+    results = {}
+
+    for first, second in itertools.combinations(engines, 2):
+        key = (first['name'], second['name'])
+        results[key] = {'first': key[0], 'second': key[1],
+                        'wins': 0, 'draws': 0, 'losses': 0}
+
+        for game in range(0, games, 2):
+            opening = random_opening(rng, plies, *variant)
+            schedule.append((first, second, opening, variant))
+            schedule.append((second, first, opening, variant))
+
+    start = time.monotonic()
+    with ProcessPoolExecutor(workers) as executor:
+        winners = list(executor.map(play_game, *zip(*schedule)))
+    seconds = time.monotonic() - start
+
+    # Count the results from the side of the first engine of each pairing
+    for (first, second, opening, variant), winner in zip(schedule,
+                                                         winners):
+        key = (first['name'], second['name'])
+        mover = '1'
+        if key not in results:
+            key = (second['name'], first['name'])
+            mover = '2'
+
+        result = results[key]
+        if winner == 'Draw!':
+            result['draws'] += 1
+        elif winner == mover:
+            result['wins'] += 1
+        else:
+            result['losses'] += 1
+
+    pairings = list(results.values())
+    for result in pairings:
+        count = result['wins'] + result['draws'] + result['losses']
+        score = (result['wins'] + result['draws'] / 2) / count
+        result['elo'] = round(elo_difference(score), 1)
+
+    return {'pairings': pairings,
+            'ratings': elo_ratings(names, pairings),
+            'games': len(schedule),
+            'seconds': round(seconds, 3),
+            'games_per_second': round(len(schedule) / seconds, 3)}
+
+
+def format_report(report):
+    """Builds the text summary of a tournament
+
+    Parameters
+    ----------
+    report : dict
+        The report returned by run_tournament
+
+    Returns
+    -------
+    str
+        The speed, the win/draw/loss table and the ratings
+    """
+
+    lines = [str(report['games']) + ' games in ' + str(report['seconds']) +
+             ' s (' + str(report['games_per_second']) + ' games/s)', '']
+
+    for result in report['pairings']:
+        lines.append(result['first'] + ' vs ' + result['second'] + ': ' +
+                     '+' + str(result['wins']) +
+                     ' =' + str(result['draws']) +
+                     ' -' + str(result['losses']) +
+                     ' (Elo ' + str(result['elo']) + ')')
+
+    lines.append('')
+    ratings = report['ratings']
+    for name in sorted(ratings, key=ratings.get, reverse=True):
+        lines.append(name + ': ' + str(ratings[name]))
+
+    return '\n'.join(lines)
+
+
+def write_report(report, path):
+    """Saves the report of a tournament as JSON
+
+    Infinite Elo differences (a pairing where one engine won every game)
+    are written as null.
+
+    Parameters
+    ----------
+    report : dict
+        The report returned by run_tournament
+    path : str
+        The file to write
+    """
+
+    pairings = [dict(result, elo=None if math.isinf(result['elo'])
+                     else result['elo'])
+                for result in report['pairings']]
+
+    with open(path, 'w') as report_file:
+        json.dump(dict(report, pairings=pairings), report_file, indent=2)
+        report_file.write('\n')
@@ -0,0 +1,177 @@
+# Bound types stored with each score
+# EXACT - The score is the value of the position
+# LOWER - The search failed high, the value is at least the score
+# UPPER - The search failed low, the value is at most the score
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# The name of each bound type, indexed by the constants above
+BOUND_NAMES = ('exact', 'lower', 'upper')
+
+
+def bound_of(score, alpha, beta):
+    """Determines what kind of bound a score returned by a search is
+
+    Parameters
+    ----------
+    score : int
+        The score returned by the search
+    alpha : int
+        The value of alpha the search started with
+    beta : int
+        The value of beta the search started with
+
+    Returns
+    -------
+    int
+        EXACT, LOWER or UPPER
+    """
+
+    # A score outside of the window is only a bound on the real value
+    if score <= alpha:
+        return UPPER
+    elif score >= beta:
+        return LOWER
+
+    return EXACT
+
+
+class TranspositionTable:
+    """This class stores the results of searches keyed by position hash.
+
+    The table has a fixed number of buckets that is computed from a memory
+    cap, so it never grows while a bot process is running. Each bucket has
+    two tiers:
+        - A depth-preferred slot that is only replaced by a search that is at
+          least as deep (or by the same position)
+        - An always-replace slot that takes every entry the first slot refuses
+    Deep results therefore survive long searches while the most recent
+    shallow results are still available.
+
+    Every entry is a tuple (key, depth, score, bound, move).
+
+    Attributes
+    ----------
+    size : int
+        The number of buckets in the table
+    deep : list of tuple
+        The depth-preferred slot of each bucket
+    recent : list of tuple
+        The always-replace slot of each bucket
+    hits : int
+        The number of probes that found the position
+    misses : int
+        The number of probes that did not find the position
+    overwrites : int
+        The number of entries of another position that were replaced
+    """
+
+    # Approximate size in bytes of a single entry: the list slot, the tuple
+    # and the 64-bit key and score objects it references
+    ENTRY_BYTES = 160
+
+    def __init__(self, memory_mb=16):
+        """Constructor for a TranspositionTable object
+
+        Parameters
+        ----------
+        memory_mb : int or float
+            The maximum amount of memory the table should use, in megabytes
+        """
+
+        self.memory_mb = memory_mb
+
+        # Each bucket holds two entries
+        self.size = max(1, int(memory_mb * 2 ** 20) // (2 * self.ENTRY_BYTES))
+
+        self.clear()
+
+    def clear(self):
+        """Removes every entry and resets the counters"""
+
+        self.deep = [None] * self.size
+        self.recent = [None] * self.size
+
+        self.hits = 0
+        self.misses = 0
+        self.overwrites = 0
+
+    def probe(self, key):
+        """Looks up a position in the table
+
+        Parameters
+        ----------
+        key : int
+            The hash of the position
+
+        Returns
+        -------
+        tuple or None
+            The entry (key, depth, score, bound, move), None if not found
+        """
+
+        index = key % self.size
+
+        entry = self.deep[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+
+        entry = self.recent[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, score, bound, move):
+        """Saves the result of a search
+
+        Parameters
+        ----------
+        key : int
+            The hash of the position
+        depth : int
+            The depth the position was searched to
+        score : int
+            The score found by the search
+        bound : int
+            EXACT, LOWER or UPPER
+        move : int
+            The best column found by the search, -1 if there is none
+        """
+
+        index = key % self.size
+        entry = (key, depth, score, bound, move)
+
+        # Use the depth-preferred slot if it is free, holds the same position
+        # or holds a shallower search
+        current = self.deep[index]
+        if current is None or current[0] == key or current[1] <= depth:
+            if current is not None and current[0] != key:
+                self.overwrites += 1
+            self.deep[index] = entry
+            return
+
+        # Otherwise always replace the second slot
+        current = self.recent[index]
+        if current is not None and current[0] != key:
+            self.overwrites += 1
+        self.recent[index] = entry
+
+    def hit_rate(self):
+        """Computes the fraction of probes that found their position
+
+        Returns
+        -------
+        float
+            The hit rate between 0 and 1, 0 if the table was never probed
+        """
+
+        probes = self.hits + self.misses
+        if probes == 0:
+            return 0.0
+
+        return self.hits / probes